@@ -1,18 +1,32 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+import json
+import queue
 import logging
+import threading
 from datetime import datetime
-from search_system import search_query, display_snippet
+from itertools import islice
+from search_system import search_query, display_snippet, search_cache
 from summary_generator import generate_summary, generate_gpt_summary
-from groundedness_identifier import compute_groundedness
+from groundedness_identifier import compute_groundedness, compute_groundedness_batch
 from cross_attribute_scorer import compute_cross_attribute_scores  # New import
 import html_parser
+from concurrency import limited_call, parallel_map, check_cancelled
+from llm_cache import llm_cache
+from evidence_retriever import EvidenceIndex, DEFAULT_TOP_K, DEFAULT_TOKEN_BUDGET
+from lexical_scorer import LexicalScorer, cascade_scores, LOW_THRESHOLD, HIGH_THRESHOLD
+from search_jobs import JobManager
 from huggingface_handler import (
     load_model,
+    start_model_load,
+    get_load_status,
+    PRECISIONS,
     unload_model,
     get_available_models,
     generate_text,
+    stream_text,
     evaluate_groundedness,
+    score_groundedness_pairs,
     generate_text_api
 )
 
@@ -28,40 +42,202 @@ def get_relevance_score(content, attribute):
     return 0.85
 
 
-def process_attribute_data(content, attribute, generator_settings, evaluation_settings, query, article_links):
+def get_evaluation_options(evaluation_settings):
+    """Extract groundedness and HuggingFace evaluator options from evaluation settings"""
+    is_groundedness_enabled = False  # Default value
+    groundedness_prompt = ""
+    groundedness_batch = True
+    evidence_settings = {}
+    cascade_settings = {}
+    huggingface_evaluator_enabled = False
+    huggingface_settings = None
+
+    # First determine if the evaluation settings is a list (from categories) or a dict
+    if isinstance(evaluation_settings, list):
+        for setting in evaluation_settings:
+            if isinstance(setting, dict) and setting.get("name") == "Answer Groundedness":
+                is_groundedness_enabled = setting.get("isEnabled", False)
+                groundedness_prompt = setting.get("prompt", "")
+                groundedness_batch = setting.get("batch", True)
+                evidence_settings = setting.get("evidence", {})
+                cascade_settings = setting.get("cascade", {})
+                break  # Exit loop once "Answer Groundedness" is found
+
+        # If huggingface evaluator is enabled in the evaluation settings
+        for setting in evaluation_settings:
+            if isinstance(setting, dict) and setting.get("huggingface"):
+                huggingface_settings = setting.get("huggingface", {})
+                huggingface_evaluator_enabled = huggingface_settings.get("evaluatorEnabled", False)
+                break
+
+    else:  # Dictionary format
+        # This handles the case where evaluation_settings is a dictionary
+        is_groundedness_enabled = evaluation_settings.get("Answer Groundedness", {}).get("isEnabled", False)
+        groundedness_prompt = evaluation_settings.get("Answer Groundedness", {}).get("prompt", "")
+        groundedness_batch = evaluation_settings.get("Answer Groundedness", {}).get("batch", True)
+        evidence_settings = evaluation_settings.get("Answer Groundedness", {}).get("evidence", {})
+        cascade_settings = evaluation_settings.get("Answer Groundedness", {}).get("cascade", {})
+        huggingface_evaluator_enabled = evaluation_settings.get("huggingface", {}).get("evaluatorEnabled", False)
+        huggingface_settings = evaluation_settings.get("huggingface", {})
+
+    return {
+        "groundedness_enabled": is_groundedness_enabled,
+        "groundedness_prompt": groundedness_prompt,
+        "groundedness_batch": groundedness_batch,
+        "evidence_enabled": evidence_settings.get("enabled", True),
+        "evidence_top_k": evidence_settings.get("topK", DEFAULT_TOP_K),
+        "evidence_token_budget": evidence_settings.get("tokenBudget", DEFAULT_TOKEN_BUDGET),
+        "cascade_enabled": cascade_settings.get("enabled", True),
+        "cascade_low": cascade_settings.get("lowThreshold", LOW_THRESHOLD),
+        "cascade_high": cascade_settings.get("highThreshold", HIGH_THRESHOLD),
+        "huggingface_evaluator_enabled": huggingface_evaluator_enabled,
+        "huggingface_settings": huggingface_settings
+    }
+
+
+def emit_event(on_event, event, payload):
+    """Report pipeline progress to an optional listener (SSE stream, job tracker)"""
+    if on_event:
+        on_event(event, payload)
+    # Stage boundaries double as cancellation checkpoints for background jobs
+    check_cancelled()
+
+
+def process_attribute_data(content, attribute, generator_settings, evaluation_settings, query, article_links,
+                           concurrent=False, on_event=None, stream_tokens=False):
     """Process content based on specific attribute"""
 
     print(evaluation_settings)
 
+    # Process articles first
+    articles = []
+    for i, article_content in enumerate(content[:5]):
+        relevance_score = get_relevance_score(article_content["extracted_content"], attribute)
+        if relevance_score > 0.6:  # relevance cutoff
+            articles.append({
+                "id": f"article_{i}",
+                "title": article_content["article_title"],
+                "content": display_snippet(article_content["extracted_content"]),
+                "url": article_links[i] if i < len(article_links) else "#",
+                "relevance_score": relevance_score
+            })
+    emit_event(on_event, "articles", {"attribute": attribute, "articles": articles})
+
     # Check if HuggingFace is the selected generator
     if generator_settings.get('generator') == 'huggingface':
-        generated_summary_list = generate_huggingface_summary(
+        # Live (SSE) listeners receive the local model's tokens as they are decoded; everyone else
+        # keeps the micro-batched generation
+        on_token = None
+        if on_event and stream_tokens:
+            def on_token(text):
+                emit_event(on_event, "summaryToken", {"attribute": attribute, "text": text})
+
+        generated_summary_list = limited_call(
+            generate_huggingface_summary,
             query,
             attribute,
             article_links,
-            generator_settings.get('huggingface', {})
+            generator_settings.get('huggingface', {}),
+            on_token
         )
     else:
         # Original generate_summary call
-        generated_summary_list = generate_summary(
+        generated_summary_list = limited_call(
+            generate_summary,
             generator_settings,
             query,
             attribute,
             article_links
         )
+    emit_event(on_event, "summaries", {"attribute": attribute, "summaries": generated_summary_list})
+
+    options = get_evaluation_options(evaluation_settings)
+    use_huggingface_evaluator = options["huggingface_evaluator_enabled"] and options["huggingface_settings"]
+    # A local evaluator in likelihood mode scores every (point, article) pair in one batched call
+    use_huggingface_likelihood = (use_huggingface_evaluator
+                                  and options["huggingface_settings"].get('deployment') != 'api'
+                                  and options["huggingface_settings"].get('scoringMode') == 'likelihood')
+
+    # Index the extracted articles so each summary point is judged against its most relevant passages
+    evidence_index = None
+    if options["groundedness_enabled"] and options["evidence_enabled"]:
+        evidence_index = EvidenceIndex(
+            article_links,
+            [article_content["extracted_content"] for article_content in content[:len(article_links)]]
+        )
 
-    # Process articles first
-    articles = []
-    for i, article_content in enumerate(content[:5]):
-        relevance_score = get_relevance_score(article_content["extracted_content"], attribute)
-        if relevance_score > 0.6:  # relevance cutoff
-            articles.append({
-                "id": f"article_{i}",
-                "title": article_content["article_title"],
-                "content": display_snippet(article_content["extracted_content"]),
-                "url": article_links[i] if i < len(article_links) else "#",
-                "relevance_score": relevance_score
-            })
+    def select_evidence(content_chunk):
+        if evidence_index is None:
+            return None
+        return evidence_index.select(content_chunk, options["evidence_top_k"], options["evidence_token_budget"])
+
+    def score_summary_point(content_chunk, urls=article_links):
+        # Check if HuggingFace is being used for evaluation - fixed to handle both list and dict formats
+        if use_huggingface_evaluator:
+            # Use HuggingFace for groundedness evaluation
+            return limited_call(
+                compute_huggingface_groundedness,
+                content_chunk,
+                urls,
+                attribute,
+                query,
+                options["huggingface_settings"],
+                select_evidence(content_chunk)
+            )
+        # Use original groundedness computation
+        return limited_call(
+            compute_groundedness,
+            content_chunk,
+            urls,
+            options["groundedness_prompt"],
+            attribute,
+            query,
+            select_evidence(content_chunk)
+        )
+
+    def score_with_llm(score_requests):
+        """Score (summary point index, article urls) pairs with the configured LLM evaluator"""
+        if use_huggingface_likelihood:
+            return limited_call(
+                compute_huggingface_groundedness_batch,
+                [generated_summary_list[i] for i, _ in score_requests],
+                [urls for _, urls in score_requests],
+                attribute,
+                query,
+                options["huggingface_settings"],
+                [select_evidence(generated_summary_list[i]) for i, _ in score_requests] if evidence_index else None
+            )
+        if options["groundedness_batch"] and not use_huggingface_evaluator:
+            # Score all requested summary points against the requested articles in one request
+            urls = [url for url in article_links if any(url in request_urls for _, request_urls in score_requests)]
+            return compute_groundedness_batch(
+                [generated_summary_list[i] for i, _ in score_requests],
+                urls,
+                options["groundedness_prompt"],
+                attribute,
+                query,
+                [select_evidence(generated_summary_list[i]) for i, _ in score_requests] if evidence_index else None,
+                concurrent=concurrent
+            )
+        if concurrent:
+            return parallel_map(lambda request: score_summary_point(generated_summary_list[request[0]], request[1]),
+                                score_requests)
+        return [score_summary_point(generated_summary_list[i], urls) for i, urls in score_requests]
+
+    # Compute groundedness scores for every summary point if enabled
+    score_tiers = None
+    if options["groundedness_enabled"]:
+        if options["cascade_enabled"]:
+            # Settle clear-cut pairs lexically and only send the uncertain ones to the LLM
+            groundedness_results, score_tiers = cascade_scores(
+                generated_summary_list,
+                LexicalScorer(article_links, [article_content["extracted_content"] for article_content in content]),
+                score_with_llm,
+                options["cascade_low"],
+                options["cascade_high"]
+            )
+        else:
+            groundedness_results = score_with_llm([(i, article_links) for i in range(len(generated_summary_list))])
 
     # Create summary points
     summary_points = []
@@ -73,56 +249,8 @@ def process_attribute_data(content, attribute, generator_settings, evaluation_se
             "source_count": len(articles)
         }
 
-        # Check if evaluation settings contain Answer Groundedness
-        is_groundedness_enabled = False  # Default value
-        groundedness_prompt = ""
-
-        # First determine if the evaluation settings is a list (from categories) or a dict
-        if isinstance(evaluation_settings, list):
-            for setting in evaluation_settings:
-                if isinstance(setting, dict) and setting.get("name") == "Answer Groundedness":
-                    is_groundedness_enabled = setting.get("isEnabled", False)
-                    groundedness_prompt = setting.get("prompt", "")
-                    break  # Exit loop once "Answer Groundedness" is found
-
-            # If huggingface evaluator is enabled in the evaluation settings
-            huggingface_evaluator_enabled = False
-            huggingface_settings = None
-
-            for setting in evaluation_settings:
-                if isinstance(setting, dict) and setting.get("huggingface"):
-                    huggingface_settings = setting.get("huggingface", {})
-                    huggingface_evaluator_enabled = huggingface_settings.get("evaluatorEnabled", False)
-                    break
-
-        else:  # Dictionary format
-            # This handles the case where evaluation_settings is a dictionary
-            is_groundedness_enabled = evaluation_settings.get("Answer Groundedness", {}).get("isEnabled", False)
-            groundedness_prompt = evaluation_settings.get("Answer Groundedness", {}).get("prompt", "")
-            huggingface_evaluator_enabled = evaluation_settings.get("huggingface", {}).get("evaluatorEnabled", False)
-            huggingface_settings = evaluation_settings.get("huggingface", {})
-
-        # Compute groundedness scores if enabled
-        if is_groundedness_enabled:
-            # Check if HuggingFace is being used for evaluation - fixed to handle both list and dict formats
-            if huggingface_evaluator_enabled and huggingface_settings:
-                # Use HuggingFace for groundedness evaluation
-                scores = compute_huggingface_groundedness(
-                    content_chunk,
-                    article_links,
-                    attribute,
-                    query,
-                    huggingface_settings
-                )
-            else:
-                # Use original groundedness computation
-                scores = compute_groundedness(
-                    content_chunk,
-                    article_links,
-                    groundedness_prompt,
-                    attribute,
-                    query
-                )
+        if options["groundedness_enabled"]:
+            scores = groundedness_results[i]
 
             # Transform scores into articleScores format
             if scores:  # Add null check since compute_groundedness might return None
@@ -134,6 +262,13 @@ def process_attribute_data(content, attribute, generator_settings, evaluation_se
                     article_scores[article_id] = score
 
                 summary_point["articleScores"] = article_scores
+
+                # Report which cascade tier ("lexical" or "llm") produced each score
+                if score_tiers is not None:
+                    summary_point["scoreTiers"] = {
+                        f"article_{j}": score_tiers[i].get(article["url"], "llm")
+                        for j, article in enumerate(articles)
+                    }
         else:
             # If groundedness is not enabled, provide default scores
             article_scores = {}
@@ -145,97 +280,191 @@ def process_attribute_data(content, attribute, generator_settings, evaluation_se
 
         summary_points.append(summary_point)
 
+    emit_event(on_event, "groundedness", {"attribute": attribute, "summary": summary_points})
+
     return {
         "summary": summary_points,
         "articles": articles
     }
 
+
+def collect_attribute_content(query, attribute, search_settings, concurrent=False, on_event=None):
+    """Search for an attribute and extract up to 5 articles from the results"""
+    attribute_content = []
+    attribute_links = []
+
+    # Materialize the (possibly lazy) result generator up front so every URL can be fetched at once
+    search_results = limited_call(
+        lambda: list(islice(search_query(query, attribute, search_settings), search_settings['num_results']))
+    )
+    emit_event(on_event, "search", {"attribute": attribute, "urls": search_results})
+
+    if concurrent:
+
+        # Fetch every result at once and fill the 5-article budget from whichever pages answer first
+        for url, extracted in html_parser.urls_to_text(search_results):
+            if not extracted or not extracted[0]:
+                continue
+            extracted_content, title = extracted
+            attribute_links.append(url)
+            attribute_content.append({"article_title": title, "extracted_content": extracted_content})
+            if len(attribute_content) >= 5:
+                break  # Stops iteration and cancels the remaining fetches
+        return attribute_content, attribute_links
+
+    for url in search_results:
+        try:
+            extracted_content, title = html_parser.url_to_text(url)
+
+            if extracted_content and len(attribute_content) < 5:
+                attribute_links.append(url)
+                attribute_content.append({"article_title": title, "extracted_content": extracted_content})
+            else:
+                break
+        except Exception as e:
+            logger.warning(f"Error processing URL for {attribute}: {str(e)}")
+            continue
+
+    return attribute_content, attribute_links
+
+
+def process_attribute(query, attribute, search_settings, generator_settings, evaluation_settings, concurrent=False,
+                      on_event=None, stream_tokens=False):
+    """Run search, extraction, summarization and groundedness scoring for one attribute"""
+    attribute_content, attribute_links = collect_attribute_content(query, attribute, search_settings, concurrent,
+                                                                   on_event)
+
+    if not attribute_content:
+        logger.warning(f"No content found for attribute: {attribute}")
+        return None
+
+    return process_attribute_data(
+        attribute_content,
+        attribute,
+        generator_settings,
+        evaluation_settings,
+        query,
+        attribute_links,
+        concurrent=concurrent,
+        on_event=on_event,
+        stream_tokens=stream_tokens
+    )
+
+
 @app.route('/')
 def home():
     return "Home Page"
 
 
+def validate_search_request(data):
+    """Return an error payload if the search request lacks a query or attributes, else None"""
+    query = data.get('query', '')
+    attributes = data.get('attributes', [])
+    if not query or not attributes:
+        return {
+            "error": "Missing required parameters",
+            "details": {
+                "query": "Required" if not query else None,
+                "attributes": "Required" if not attributes else None
+            }
+        }
+    return None
+
+
+def build_search_response(data, on_event=None, stream_tokens=False):
+    """
+    Run the full search pipeline for a validated request.
+
+    Args:
+        data (dict): The /api/search request body
+        on_event: Optional callable(event, payload) notified as each stage of each attribute completes
+        stream_tokens (bool): Also report each token of local HuggingFace summaries as summaryToken events
+
+    Returns:
+        dict: The /api/search response payload
+    """
+    query = data.get('query', '')
+    browser = data.get('browser', {}).get('type', 'google')
+    generator_settings = data.get('generator', {})
+    evaluation_settings = data.get('evaluation', {}).get('categories', {})
+    attributes = data.get('attributes', [])
+    execution_mode = data.get('executionMode', 'concurrent')
+    cross_attribute_settings = data.get('crossAttribute', {})
+
+    logger.info(f"Processing search request - Query: {query}, Browser: {browser}, Attributes: {attributes}, "
+                f"Execution: {execution_mode}")
+
+    # Search settings
+    search_settings = {
+        'search_system': browser,
+        'num_results': 10,
+        'relevance_cutoff': 0.6
+    }
+
+    # Process results for each attribute, in parallel unless sequential execution is requested
+    concurrent = execution_mode != 'sequential'
+
+    def run_attribute(attribute):
+        return process_attribute(query, attribute, search_settings, generator_settings,
+                                 evaluation_settings, concurrent=concurrent, on_event=on_event,
+                                 stream_tokens=stream_tokens)
+
+    if concurrent:
+        attribute_results = parallel_map(run_attribute, attributes)
+    else:
+        attribute_results = [run_attribute(attribute) for attribute in attributes]
+
+    articles_and_summaries = {}
+    for attribute, attribute_result in zip(attributes, attribute_results):
+        if attribute_result:
+            articles_and_summaries[attribute] = attribute_result
+
+    check_cancelled()
+
+    # NEW CODE: Calculate cross-attribute scores if there are multiple attributes
+    if len(articles_and_summaries) > 1:
+        # Get API key from generator settings
+        api_key = generator_settings.get('apiKey', '')
+        # Compute cross-attribute relevance scores
+        articles_and_summaries = compute_cross_attribute_scores(
+            articles_and_summaries,
+            api_key,
+            method=cross_attribute_settings.get('method', 'embedding'),
+            rescore_top_k=cross_attribute_settings.get('rescoreTopK', 0)
+        )
+        emit_event(on_event, "crossAttribute", {
+            attribute: [
+                {"id": point["id"], "crossAttributeScores": point.get("crossAttributeScores", {})}
+                for point in result["summary"]
+            ]
+            for attribute, result in articles_and_summaries.items()
+        })
+
+    return {
+        "status": "success",
+        "query": query,
+        "timestamp": datetime.now().isoformat(),
+        "results": articles_and_summaries,
+        "metadata": {
+            "browser": browser,
+            "total_sources": len(articles_and_summaries),
+            "processed_attributes": len(articles_and_summaries),
+            "processing_time": datetime.now().isoformat()
+        }
+    }
+
+
 @app.route('/api/search', methods=['POST'])
 def perform_search():
     try:
         data = request.get_json()
         print(data)
-        query = data.get('query', '')
-        browser = data.get('browser', {}).get('type', 'google')
-        generator_settings = data.get('generator', {})
-        evaluation_settings = data.get('evaluation', {}).get('categories', {})
-        attributes = data.get('attributes', [])
 
-        logger.info(f"Processing search request - Query: {query}, Browser: {browser}, Attributes: {attributes}")
+        error = validate_search_request(data)
+        if error:
+            return jsonify(error), 400
 
-        if not query or not attributes:
-            return jsonify({
-                "error": "Missing required parameters",
-                "details": {
-                    "query": "Required" if not query else None,
-                    "attributes": "Required" if not attributes else None
-                }
-            }), 400
-
-        # Search settings
-        search_settings = {
-            'search_system': browser,
-            'num_results': 10,
-            'relevance_cutoff': 0.6
-        }
-
-        # Process results for each attribute
-        articles_and_summaries = {}
-        for attribute in attributes:
-            search_results = search_query(query, attribute, search_settings)
-            attribute_content = []
-            attribute_links = []
-
-            for url in search_results:
-                try:
-                    extracted_content, title = html_parser.url_to_text(url)
-
-                    if extracted_content and len(attribute_content) < 5:
-                        attribute_links.append(url)
-                        attribute_content.append({"article_title": title, "extracted_content": extracted_content})
-                    else:
-                        break
-                except Exception as e:
-                    logger.warning(f"Error processing URL for {attribute}: {str(e)}")
-                    continue
-
-            # Process data for this attribute
-            if attribute_content:
-                articles_and_summaries[attribute] = process_attribute_data(
-                    attribute_content,
-                    attribute,
-                    generator_settings,
-                    evaluation_settings,
-                    query,
-                    attribute_links
-                )
-            else:
-                logger.warning(f"No content found for attribute: {attribute}")
-
-        # NEW CODE: Calculate cross-attribute scores if there are multiple attributes
-        if len(articles_and_summaries) > 1:
-            # Get API key from generator settings
-            api_key = generator_settings.get('apiKey', '')
-            # Compute cross-attribute relevance scores
-            articles_and_summaries = compute_cross_attribute_scores(articles_and_summaries, api_key)
-
-        response_data = {
-            "status": "success",
-            "query": query,
-            "timestamp": datetime.now().isoformat(),
-            "results": articles_and_summaries,
-            "metadata": {
-                "browser": browser,
-                "total_sources": len(articles_and_summaries),
-                "processed_attributes": len(articles_and_summaries),
-                "processing_time": datetime.now().isoformat()
-            }
-        }
+        response_data = build_search_response(data)
         print(response_data)
         return jsonify(response_data), 200
 
@@ -248,6 +477,112 @@ def perform_search():
         }), 500
 
 
+def format_sse(event, payload):
+    """Serialize one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route('/api/search/stream', methods=['POST'])
+def perform_search_stream():
+    """
+    Streaming variant of /api/search.
+
+    Emits a Server-Sent Event as each stage of each attribute completes (search,
+    articles, summaries, groundedness), then crossAttribute, and finally a
+    result event carrying the same payload /api/search would return. Local
+    HuggingFace generators also emit summaryToken events while decoding.
+    """
+    data = request.get_json()
+
+    error = validate_search_request(data)
+    if error:
+        return jsonify(error), 400
+
+    events = queue.Queue()
+
+    def on_event(event, payload):
+        # Serialize immediately: later stages keep mutating the same summary dicts
+        events.put(format_sse(event, payload))
+
+    def run():
+        try:
+            on_event("result", build_search_response(data, on_event, stream_tokens=True))
+        except Exception as e:
+            logger.error(f"Error processing search stream: {str(e)}", exc_info=True)
+            on_event("error", {
+                "error": "Internal server error",
+                "details": str(e),
+                "timestamp": datetime.now().isoformat()
+            })
+        finally:
+            events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    def stream():
+        while True:
+            message = events.get()
+            if message is None:
+                break
+            yield message
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+job_manager = JobManager(build_search_response)
+
+
+@app.route('/api/search/jobs', methods=['POST'])
+def create_search_job():
+    """Start a background search and return its job id immediately."""
+    try:
+        data = request.get_json()
+
+        error = validate_search_request(data)
+        if error:
+            return jsonify(error), 400
+
+        job = job_manager.submit(data)
+        return jsonify({"status": "accepted", "job_id": job.id, "job_status": job.status}), 202
+
+    except Exception as e:
+        logger.error(f"Error creating search job: {str(e)}", exc_info=True)
+        return jsonify({
+            "error": "Internal server error",
+            "details": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+
+@app.route('/api/search/jobs/<job_id>', methods=['GET'])
+def get_search_job(job_id):
+    """Report per-stage progress and partial (or final) results of a search job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/search/jobs/<job_id>', methods=['DELETE'])
+def cancel_search_job(job_id):
+    """Cancel a search job, stopping its outstanding fetches and LLM calls."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "success", "job_id": job.id, "job_status": job.status}), 200
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Report hit/miss statistics for the in-process caches."""
+    return jsonify({
+        "status": "success",
+        "search": search_cache.stats(),
+        "llm": llm_cache.stats()
+    }), 200
+
+
 @app.route('/api/huggingface/models', methods=['GET'])
 def get_models():
     """Get list of available HuggingFace models."""
@@ -261,12 +596,19 @@ def get_models():
 
 @app.route('/api/huggingface/load', methods=['POST'])
 def load_hf_model():
-    """Load a HuggingFace model."""
+    """
+    Load a HuggingFace model.
+
+    Starts the load in the background and returns its load id (poll
+    /api/huggingface/load/<load_id>); pass "wait": true to block until it finishes.
+    "precision" selects fp32, bf16 or int8 weights on CPU (fp16 on GPU).
+    """
     try:
         data = request.get_json()
         model_name = data.get('model_name')
         model_type = data.get('model_type', 'generator')
         use_gpu = data.get('use_gpu', True)
+        precision = data.get('precision')
 
         if not model_name:
             return jsonify({
@@ -274,8 +616,25 @@ def load_hf_model():
                 "message": "Model name is required"
             }), 400
 
-        result = load_model(model_name, model_type, use_gpu)
-        return jsonify(result), 200 if result["status"] == "success" else 500
+        if precision and precision not in PRECISIONS:
+            return jsonify({
+                "status": "error",
+                "message": f"precision must be one of: {', '.join(PRECISIONS)}"
+            }), 400
+
+        if data.get('wait', False):
+            result = load_model(model_name, model_type, use_gpu, precision)
+            return jsonify(result), 200 if result["status"] == "success" else 500
+
+        task = start_model_load(model_name, model_type, use_gpu, precision)
+        return jsonify({"status": "success", **task.to_dict()}), 202
+
+    except ValueError as e:
+        # A precision the device cannot load
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
 
     except Exception as e:
         logger.error(f"Error loading model: {str(e)}", exc_info=True)
@@ -285,6 +644,15 @@ def load_hf_model():
         }), 500
 
 
+@app.route('/api/huggingface/load/<load_id>', methods=['GET'])
+def get_hf_load_status(load_id):
+    """Report the stage (resolving, downloading, materializing, warming, ready or failed) of a model load."""
+    load_status = get_load_status(load_id)
+    if load_status is None:
+        return jsonify({"status": "error", "message": "Load not found"}), 404
+    return jsonify({"status": "success", **load_status}), 200
+
+
 @app.route('/api/huggingface/unload', methods=['POST'])
 def unload_hf_model():
     """Unload a HuggingFace model."""
@@ -310,8 +678,46 @@ def unload_hf_model():
         }), 500
 
 
-def generate_huggingface_summary(query, attribute, article_links, settings):
-    """Generate summary using HuggingFace models."""
+@app.route('/api/huggingface/generate/stream', methods=['POST'])
+def stream_hf_generation():
+    """
+    Generate with a loaded local model, streaming tokens as Server-Sent Events.
+
+    Emits a token event per decoded piece, then done with the full text (or error).
+    """
+    data = request.get_json() or {}
+    model_name = data.get('model_name')
+    prompt = data.get('prompt')
+
+    if not model_name or not prompt:
+        return jsonify({
+            "status": "error",
+            "message": "Model name and prompt are required"
+        }), 400
+
+    def stream():
+        pieces = []
+        try:
+            for text in stream_text(model_name, prompt, data.get('params')):
+                pieces.append(text)
+                yield format_sse("token", {"text": text})
+            yield format_sse("done", {"status": "success", "text": "".join(pieces).strip()})
+        except Exception as e:
+            logger.error(f"Error streaming generation: {str(e)}", exc_info=True)
+            yield format_sse("error", {"status": "error", "message": str(e)})
+
+    # A client disconnect closes the generator, which stops generation at the next token
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def generate_huggingface_summary(query, attribute, article_links, settings, on_token=None):
+    """
+    Generate summary using HuggingFace models.
+
+    With on_token, a local model streams its output and on_token(text) is called with each
+    decoded piece; otherwise local generation is batched with concurrent requests.
+    """
     try:
         # Check whether to use API or local model
         if settings.get('deployment') == 'api':
@@ -359,16 +765,21 @@ def generate_huggingface_summary(query, attribute, article_links, settings):
                 f"Provide 3 distinct paragraphs that capture the key points:"
             )
 
+            params = {
+                "max_new_tokens": settings.get('maxNewTokens', 512),
+                "temperature": settings.get('temperature', 0.7),
+                "top_p": settings.get('topP', 0.95)
+            }
+
             # Generate text using loaded model
-            result = generate_text(
-                model_name=model_name,
-                prompt=prompt,
-                params={
-                    "max_new_tokens": settings.get('maxNewTokens', 512),
-                    "temperature": settings.get('temperature', 0.7),
-                    "top_p": settings.get('topP', 0.95)
-                }
-            )
+            if on_token:
+                pieces = []
+                for text in stream_text(model_name=model_name, prompt=prompt, params=params):
+                    pieces.append(text)
+                    on_token(text)
+                result = "".join(pieces).strip()
+            else:
+                result = generate_text(model_name=model_name, prompt=prompt, params=params)
 
             # Split into paragraphs
             paragraphs = [p.strip() for p in result.split("\n\n") if p.strip()]
@@ -381,7 +792,7 @@ def generate_huggingface_summary(query, attribute, article_links, settings):
         return [f"Error generating summary: {str(e)}"]
 
 
-def compute_huggingface_groundedness(summary_sentence, articles, attribute, query, settings):
+def compute_huggingface_groundedness(summary_sentence, articles, attribute, query, settings, evidence=None):
     """Compute groundedness using HuggingFace models."""
     try:
         # Check whether to use API or local model
@@ -411,7 +822,9 @@ def compute_huggingface_groundedness(summary_sentence, articles, attribute, quer
                 summary_text=summary_sentence,
                 articles=articles,
                 query=query,
-                attribute=attribute
+                attribute=attribute,
+                evidence=evidence,
+                mode=settings.get('scoringMode', 'generate')
             )
 
     except Exception as e:
@@ -419,6 +832,36 @@ def compute_huggingface_groundedness(summary_sentence, articles, attribute, quer
         return {url: 0 for url in articles}
 
 
+def compute_huggingface_groundedness_batch(summary_points, article_lists, attribute, query, settings,
+                                           evidence_list=None):
+    """
+    Score several summary points with a local HuggingFace evaluator in likelihood mode.
+
+    Every (summary point, article) pair goes into one batched scoring call.
+
+    Args:
+        summary_points (list): Summary point texts
+        article_lists (list): Article URLs to score, one list per summary point
+        evidence_list (list): Optional {url: [passages]} per summary point
+
+    Returns:
+        list: {url: score} per summary point
+    """
+    # One pair per distinct url, so the scores line up with the urls they are read back into
+    article_lists = [list(dict.fromkeys(urls)) for urls in article_lists]
+    pairs = [
+        (summary_point, url, evidence_list[i] if evidence_list else None)
+        for i, (summary_point, urls) in enumerate(zip(summary_points, article_lists))
+        for url in urls
+    ]
+    try:
+        scores = iter(score_groundedness_pairs(settings.get('selectedModel'), pairs, query, attribute))
+    except Exception as e:
+        logger.error(f"HuggingFace evaluation error: {str(e)}")
+        return [{url: 0 for url in urls} for urls in article_lists]
+    return [{url: next(scores) for url in urls} for urls in article_lists]
+
+
 @app.route('/api/test-search', methods=['GET', 'POST'])
 def test_search():
     """Test endpoint that returns dummy data to test frontend color coding"""
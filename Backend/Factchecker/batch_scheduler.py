@@ -0,0 +1,154 @@
+"""
+Dynamic micro-batching for local model inference.
+Requests from many threads are queued per model and grouped into batches of compatible
+requests (same decoding parameters) within a short wait window, so one forward/generate
+call serves several callers.
+"""
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.environ.get('HF_BATCH_MAX_SIZE', 8))
+MAX_WAIT_MS = float(os.environ.get('HF_BATCH_MAX_WAIT_MS', 10))
+
+
+def params_key(params):
+    """Requests can share a batch only when their decoding parameters are identical."""
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+class SchedulerClosed(RuntimeError):
+    """A request reached a scheduler that was closed (its model was unloaded or evicted)."""
+
+
+class _Request:
+    __slots__ = ('item', 'params', 'key', 'future')
+
+    def __init__(self, item, params):
+        self.item = item
+        self.params = params
+        self.key = params_key(params)
+        self.future = Future()
+
+
+class BatchScheduler:
+    """Queues requests for one model and runs them in batches on a dedicated worker thread."""
+
+    def __init__(self, run_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, name='model'):
+        """
+        Args:
+            run_batch: Callable(items, params) returning one result per item, in order
+            max_batch_size (int): Maximum requests per batch
+            max_wait_ms (float): How long the first request of a batch waits for others to join
+            name (str): Used for the worker thread name and logs
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._pending = []  # requests taken off the queue that did not fit the last batch
+        self._closed = False
+        self._close_lock = threading.Lock()  # makes the closed check and the enqueue one step
+        self._stats = {"requests": 0, "batches": 0, "max_batch": 0}
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._loop, name=f'batch-{name}', daemon=True)
+        self._worker.start()
+
+    def submit(self, item, params=None):
+        """
+        Queue an item and return a Future for its result.
+
+        Raises:
+            SchedulerClosed: If the scheduler is closed
+        """
+        request = _Request(item, params)
+        with self._close_lock:
+            if self._closed:
+                raise SchedulerClosed(f"Scheduler for {self.name} is closed")
+            self._queue.put(request)
+        return request.future
+
+    def run(self, item, params=None):
+        """Queue an item and wait for its result."""
+        return self.submit(item, params).result()
+
+    def close(self):
+        """Stop accepting requests; a batch already running finishes, requests still queued fail with SchedulerClosed."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["average_batch"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _next(self, timeout=None):
+        if self._pending:
+            return self._pending.pop(0)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _collect(self, first):
+        """Gather requests compatible with the first one until the batch is full or the window closes."""
+        batch = [first]
+        deferred = []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not self._pending:
+                break
+            request = self._next(timeout=max(remaining, 0))
+            if request is None:
+                if self._closed:
+                    # Leave the shutdown sentinel for the worker loop
+                    self._queue.put(None)
+                    break
+                if remaining <= 0:
+                    break
+                continue
+            if request.key == first.key:
+                batch.append(request)
+            else:
+                deferred.append(request)
+        self._pending = deferred + self._pending
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._next()
+            if first is None:
+                if self._closed and self._queue.empty() and not self._pending:
+                    return
+                continue
+            if self._closed:
+                first.future.set_exception(SchedulerClosed(f"Scheduler for {self.name} was closed"))
+                continue
+            batch = self._collect(first)
+            try:
+                results = self.run_batch([request.item for request in batch], first.params)
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} requests")
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} for {self.name} failed: {str(e)}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            with self._stats_lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
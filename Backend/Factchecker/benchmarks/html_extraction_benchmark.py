@@ -0,0 +1,116 @@
+"""
+Benchmark HTML text extraction engines over a fixed corpus.
+
+Compares the previous path (BeautifulSoup html.parser tree, prettify() and whole-page
+get_text) with the html_extractor engines, reporting throughput and output size.
+
+Usage:
+    python benchmarks/html_extraction_benchmark.py [--corpus DIR] [--pages N] [--repeat N]
+
+Without --corpus a deterministic synthetic corpus of article-like pages (navigation,
+sidebars, link lists, comments and footers around the article body) is generated. Some
+articles sit inside layout wrappers whose class names only resemble boilerplate, or inside
+an ASP.NET page-wide <form>, which must not hide the article.
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extractor  # noqa: E402
+
+WORDS = ("the match was played in front of a large crowd while both teams struggled with the heat and "
+         "a long season of training finally paid off for the young players who scored twice").split()
+
+
+def _sentence(rng, words=18):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+# Wrappers around the article that are layout, not boilerplate
+ARTICLE_WRAPPERS = (
+    ('', ''),
+    ('<div class="layout has-sidebar">', '</div>'),
+    ('<div class="site-content header-offset">', '</div>'),
+    ('<div class="post share-enabled">', '</div>'),
+    ('<form id="aspnetForm" method="post" action="./article.aspx">', '</form>'),
+)
+
+
+def synthetic_page(rng, paragraphs):
+    links = ''.join(f'<li><a href="/section/{i}">Section {i} {rng.choice(WORDS)}</a></li>' for i in range(60))
+    body = ''.join(f'<p>{" ".join(_sentence(rng) for _ in range(5))}</p>' for _ in range(paragraphs))
+    comments = ''.join(f'<div class="comment"><p>{_sentence(rng, 12)}</p></div>' for _ in range(40))
+    wrapper_start, wrapper_end = rng.choice(ARTICLE_WRAPPERS)
+    return (
+        f'<!DOCTYPE html><html><head><title>Article {rng.randint(0, 10 ** 6)}</title>'
+        f'<style>{"body{margin:0} " * 200}</style><script>{"var x = 1; " * 500}</script></head><body>'
+        f'<header><nav><ul>{links}</ul></nav></header>'
+        f'<div class="sidebar"><ul>{links}</ul></div>'
+        f'{wrapper_start}<article><h1>{_sentence(rng, 8)}</h1>{body}</article>{wrapper_end}'
+        f'<section class="comments">{comments}</section>'
+        f'<footer><ul>{links}</ul><p>Copyright notice and legal text.</p></footer>'
+        f'</body></html>'
+    )
+
+
+def load_corpus(directory, pages):
+    if directory:
+        documents = []
+        for path in sorted(glob.glob(os.path.join(directory, '*.htm*')))[:pages]:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                documents.append(f.read())
+        return documents
+    rng = random.Random(1234)
+    # Mix of short, typical and very long pages
+    return [synthetic_page(rng, rng.choice([5, 20, 20, 40, 200])) for _ in range(pages)]
+
+
+def legacy_extract(html_text):
+    """The extraction previously done by html_parser.parse_html"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_text, 'html.parser')
+    title = soup.title.string if soup.title else "No title found"
+    soup.prettify()
+    return soup.get_text(separator="\n", strip=True), title
+
+
+def run(name, fn, documents, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [fn(document) for document in documents]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    input_mb = sum(len(document) for document in documents) / 1e6
+    output_chars = sum(len(text) for text, _ in outputs)
+    print(f"{name:<10} {len(documents) / best:>9.1f} pages/s {input_mb / best:>8.2f} MB/s "
+          f"{best * 1000 / len(documents):>8.2f} ms/page {output_chars / len(documents):>10.0f} chars/page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--corpus', help='Directory of .html files (default: synthetic corpus)')
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-chars', type=int, default=html_extractor.MAX_CHARS)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus, args.pages)
+    if not documents:
+        parser.error('No documents found')
+    print(f"{len(documents)} pages, {sum(len(d) for d in documents) / 1e6:.1f} MB, best of {args.repeat}")
+
+    run('legacy', legacy_extract, documents, args.repeat)
+    engines = ['soup', 'stdlib'] + (['lxml'] if html_extractor.etree is not None else [])
+    for engine in engines:
+        run(engine, lambda document: html_extractor.extract(document, engine, args.max_chars), documents, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Compare memory footprint and CPU generation speed of a local HF model at each precision.
+
+Usage:
+    python benchmarks/precision_benchmark.py MODEL_NAME [--precisions fp32 bf16 int8] [--tokens N]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from huggingface_handler import benchmark_precisions  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('model_name')
+    parser.add_argument('--precisions', nargs='+', default=['fp32', 'bf16', 'int8'])
+    parser.add_argument('--tokens', type=int, default=32, help='New tokens generated per measurement')
+    parser.add_argument('--prompt', default='The history of the printing press')
+    args = parser.parse_args()
+
+    print(f"{'precision':<10} {'footprint MB':>13} {'load s':>8} {'tokens/s':>9}")
+    for row in benchmark_precisions(args.model_name, args.precisions, args.prompt, args.tokens):
+        if 'error' in row:
+            print(f"{row['precision']:<10} error: {row['error']}")
+        else:
+            print(f"{row['precision']:<10} {row['footprint_mb']:>13.1f} {row['load_seconds']:>8.2f} "
+                  f"{row['tokens_per_second']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,34 +13,16 @@ This sample makes a call to the Bing Web Search API with a query and returns rel
 Documentation: https://docs.microsoft.com/en-us/bing/search-apis/bing-web-search/overview
 '''
 
-# Add your Bing Search V7 subscription key and endpoint to your environment variables.
+# Add your Bing Search V7 subscription key to the BING_KEY environment variable.
+# Requests go through BingSearchBackend, which reads the key lazily and adds
+# connection pooling, retries with backoff and QPS limiting.
 # with open('.bing_key','r+') as f:
 #     bing_key = f.read().strip()
-subscription_key = os.environ['BING_KEY']
-
-endpoint = "https://api.bing.microsoft.com/v7.0/search"
+from search_backends import get_backend, BING_ENDPOINT as endpoint, BING_MARKET as mkt
 
 # Query term(s) to search for.
 # query = "Sachin Tendulkar"
 
-# Construct a request
-mkt = 'en-US'
-# params = {'q': query, 'mkt': mkt}
-headers = {'Ocp-Apim-Subscription-Key': subscription_key}
-
-# Call the API
-# try:
-#     response = requests.get(endpoint, headers=headers, params=params)
-#     response.raise_for_status()
-#
-#     print("Headers:")
-#     print(response.headers)
-#
-#     print("JSON Response:")
-#     pprint(response.json())
-# except Exception as ex:
-#     raise ex
-
 def get_first_webpage_url(data, first=0):
     try:
         # Check if 'webPages' key exists and has 'value' key containing at least one item
@@ -54,32 +36,15 @@ def get_first_webpage_url(data, first=0):
         return None
 
 def bing_search(query, count=3):
-    params = {'q': query, 'mkt':mkt, 'answerCount': 10, 'count': count, 'promote': 'webpages'}
-    try:
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        first_webpage_url = get_first_webpage_url(response.json())
-        if count == 2:
-            second_webpage_url = get_first_webpage_url(response.json(), first=1)
-            return first_webpage_url, second_webpage_url
-        return first_webpage_url
-    except Exception as ex:
-        raise ex
-    return None
+    data = get_backend('bing').query_raw(query, count)
+    first_webpage_url = get_first_webpage_url(data)
+    if count == 2:
+        second_webpage_url = get_first_webpage_url(data, first=1)
+        return first_webpage_url, second_webpage_url
+    return first_webpage_url
 
 def bing_search_get_multiple(query, count=10):
-    urls = []
-    params = {'q': query, 'mkt':mkt, 'answerCount': 10, 'count': count, 'promote': 'webpages'}
-    try:
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        for index in range(count):
-            first_webpage_url = get_first_webpage_url(response.json(), first=index)
-            urls.append(first_webpage_url)
-        return urls
-    except Exception as ex:
-        raise ex
-    return []
+    return get_backend('bing').search(query, count=count)
 
 # if __name__ == '__main__':
 #     #response = bing_search('John Kruzel, “Did Reagan and H.W. Bush Issue Actions Similar to DACA, as Al Franken Said?,” politifact.com, Sep. 8, 2017')
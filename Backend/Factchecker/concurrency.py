@@ -0,0 +1,91 @@
+"""
+Concurrency helpers for the search pipeline.
+Runs attributes, article fetches and LLM calls in parallel under one global cap.
+"""
+import os
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of outbound network/LLM calls in flight across all requests
+MAX_CONCURRENCY = int(os.environ.get('PIPELINE_MAX_CONCURRENCY', 16))
+
+_call_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+# Cancellation flag of the search that owns the current call, propagated into worker threads
+_cancel_event = contextvars.ContextVar('cancel_event', default=None)
+
+
+class SearchCancelled(Exception):
+    """Raised when the search that owns the current call has been cancelled."""
+
+
+@contextmanager
+def cancellation_scope(cancel_event):
+    """Make every limited call made inside the block (and its thread fan-out) honor cancel_event."""
+    token = _cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled():
+    """Raise SearchCancelled if the current search has been cancelled."""
+    cancel_event = _cancel_event.get()
+    if cancel_event is not None and cancel_event.is_set():
+        raise SearchCancelled()
+
+
+def submit_in_context(executor, fn, *args):
+    """Submit fn to an executor so it runs with the caller's context (and cancellation scope)."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+@contextmanager
+def call_slot():
+    """Hold one global concurrency slot for the duration of the block."""
+    check_cancelled()
+    with _call_slots:
+        # The search may have been cancelled while this call was waiting for a slot
+        check_cancelled()
+        yield
+
+
+def limited_call(fn, *args, **kwargs):
+    """
+    Run a blocking network or LLM call while holding a global concurrency slot.
+
+    Only leaf calls take a slot, so nested fan-out (attributes -> URLs -> LLM
+    calls) can never deadlock waiting on its own children.
+    """
+    with call_slot():
+        return fn(*args, **kwargs)
+
+
+def parallel_map(fn, items, max_workers=None):
+    """
+    Apply fn to every item in parallel threads.
+
+    Args:
+        fn: Callable taking a single item
+        items: Iterable of inputs
+        max_workers: Thread count for this fan-out (defaults to MAX_CONCURRENCY)
+
+    Returns:
+        list: Results in the same order as items
+    """
+    items = list(items)
+    if not items:
+        return []
+    if len(items) == 1:
+        return [fn(items[0])]
+
+    workers = min(len(items), max_workers or MAX_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [submit_in_context(executor, fn, item) for item in items]
+        return [future.result() for future in futures]
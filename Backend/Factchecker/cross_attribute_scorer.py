@@ -2,22 +2,31 @@
 Cross-attribute relevance scoring module.
 Evaluates the similarity between summaries across different attributes.
 """
+import os
 import requests
 import logging
 import json
 
+from concurrency import limited_call, parallel_map
+from summary_embeddings import embed_texts, similarity_scores
+from llm_cache import cached_post_json
+
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-def compute_cross_attribute_scores(results, api_key=None):
+def compute_cross_attribute_scores(results, api_key=None, method='embedding', rescore_top_k=0,
+                                   embedding_backend='transformer'):
     """
     Compute cross-attribute relevance scores between summaries of different attributes.
 
     Args:
         results: Dictionary containing results by attribute with summaries and articles
         api_key: OpenAI API key for scoring (optional if set in environment)
+        method: 'embedding' to score every pair from local embeddings, or 'llm' for one LLM call per pair
+        rescore_top_k: With 'embedding', re-score this many of the most ambiguous pairs with the LLM
+        embedding_backend: 'transformer' or 'hashing' (see summary_embeddings.embed_texts)
 
     Returns:
         Updated results dictionary with crossAttributeScores added to each summary
@@ -27,7 +36,7 @@ def compute_cross_attribute_scores(results, api_key=None):
         logger.info("Only one attribute found, skipping cross-attribute scoring")
         return results
 
-    logger.info(f"Computing cross-attribute scores for {len(results)} attributes")
+    logger.info(f"Computing cross-attribute scores for {len(results)} attributes using {method}")
 
     # Extract summaries by attribute
     summaries_by_attribute = {}
@@ -35,6 +44,16 @@ def compute_cross_attribute_scores(results, api_key=None):
         if 'summary' in data:
             summaries_by_attribute[attr] = data['summary']
 
+    if method == 'llm':
+        _compute_llm_scores(summaries_by_attribute, api_key)
+    else:
+        _compute_embedding_scores(summaries_by_attribute, api_key, rescore_top_k, embedding_backend)
+
+    return results
+
+
+def _compute_llm_scores(summaries_by_attribute, api_key):
+    """Score every ordered pair of summaries across attributes with one LLM call each."""
     # For each attribute and summary, compare with all summaries from other attributes
     for source_attr, source_summaries in summaries_by_attribute.items():
         for source_summary in source_summaries:
@@ -61,7 +80,54 @@ def compute_cross_attribute_scores(results, api_key=None):
                     # Store the score
                     source_summary['crossAttributeScores'][target_attr][target_summary['id']] = score
 
-    return results
+
+def _compute_embedding_scores(summaries_by_attribute, api_key, rescore_top_k, embedding_backend):
+    """
+    Score every pair of summaries across attributes from one embedding similarity matrix.
+
+    Similarity is symmetric, so each unordered pair is scored once and written in both
+    directions. Optionally the rescore_top_k pairs closest to the middle of the scale,
+    where the embedding score is least decisive, are re-scored by the LLM.
+    """
+    entries = [
+        (attr, summary)
+        for attr, summaries in summaries_by_attribute.items()
+        for summary in summaries
+    ]
+    scores = similarity_scores(embed_texts([summary['text'] for _, summary in entries], backend=embedding_backend))
+
+    pair_scores = {}
+    for i, (source_attr, _) in enumerate(entries):
+        for j in range(i + 1, len(entries)):
+            if entries[j][0] != source_attr:
+                pair_scores[(i, j)] = float(scores[i, j])
+
+    if rescore_top_k and pair_scores:
+        ambiguous = sorted(pair_scores, key=lambda pair: abs(pair_scores[pair] - 2.5))[:rescore_top_k]
+        rescored = parallel_map(
+            lambda pair: limited_call(
+                evaluate_summary_similarity, entries[pair[0]][1]['text'], entries[pair[1]][1]['text'], api_key
+            ),
+            ambiguous
+        )
+        pair_scores.update(zip(ambiguous, rescored))
+
+    for _, summary in entries:
+        summary.setdefault('crossAttributeScores', {})
+
+    for (i, j), score in pair_scores.items():
+        (attr_i, summary_i), (attr_j, summary_j) = entries[i], entries[j]
+        summary_i['crossAttributeScores'].setdefault(attr_j, {})[summary_j['id']] = score
+        summary_j['crossAttributeScores'].setdefault(attr_i, {})[summary_i['id']] = score
+
+
+def _holds_number(response_json):
+    """Whether a chat response's content parses as the numeric similarity score."""
+    try:
+        float(response_json['choices'][0]['message']['content'].strip())
+        return True
+    except (KeyError, IndexError, TypeError, AttributeError, ValueError):
+        return False
 
 
 def evaluate_summary_similarity(summary1, summary2, api_key):
@@ -124,10 +190,8 @@ def evaluate_summary_similarity(summary1, summary2, api_key):
     ENDPOINT = "https://sweden-api.openai.azure.com/openai/deployments/gpt-4o-mini-atharv/chat/completions?api-version=2024-02-15-preview"
 
     try:
-        response = requests.post(ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-
-        response_json = response.json()
+        # Sampled judgments are only served from cache when LLM_CACHE_ALLOW_SAMPLED=1, and only numeric ones
+        response_json = cached_post_json(ENDPOINT, headers, payload, store_if=_holds_number)
         content = response_json['choices'][0]['message']['content']
 
         # Parse the response to get the numerical score
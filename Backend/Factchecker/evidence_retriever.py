@@ -0,0 +1,142 @@
+"""
+Evidence passage retrieval for groundedness evaluation.
+Chunks extracted articles into passages, indexes them with BM25 and selects the
+passages most relevant to each summary point within a token budget.
+"""
+import re
+import math
+from collections import Counter, defaultdict
+
+PASSAGE_WORDS = 120
+DEFAULT_TOP_K = 3
+DEFAULT_TOKEN_BUDGET = 800
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were "
+    "will with which who what when where how not no can could would should may might than then there "
+    "their they them these those also such into about over more most other some".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed."""
+    return [token for token in re.findall(r'\w+', text.lower()) if token not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def split_passages(text, passage_words=PASSAGE_WORDS):
+    """Split text into passages of roughly passage_words words on sentence boundaries."""
+    sentences = re.split(r'(?<=[.!?])\s+|\n+', text or '')
+    passages, current, count = [], [], 0
+    for sentence in sentences:
+        words = sentence.split()
+        # Very long "sentences" (text without punctuation) are cut into passage-sized windows
+        for start in range(0, len(words), passage_words):
+            piece = words[start:start + passage_words]
+            if current and count + len(piece) > passage_words:
+                passages.append(' '.join(current))
+                current, count = [], 0
+            current.append(' '.join(piece))
+            count += len(piece)
+    if current:
+        passages.append(' '.join(current))
+    return passages
+
+
+class EvidenceIndex:
+    """Per-request BM25 index over the passages of a set of articles."""
+
+    def __init__(self, urls, texts, k1=1.5, b=0.75, passage_words=PASSAGE_WORDS):
+        """
+        Args:
+            urls (list): Article URLs
+            texts (list): Extracted article text, aligned with urls
+        """
+        self.k1 = k1
+        self.b = b
+        self.passages = []  # (url, text)
+        self._lengths = []
+        self._postings = defaultdict(list)  # term -> [(passage index, term frequency)]
+
+        for url, text in zip(urls, texts):
+            for passage in split_passages(text, passage_words):
+                index = len(self.passages)
+                tokens = tokenize(passage)
+                self.passages.append((url, passage))
+                self._lengths.append(len(tokens))
+                for term, frequency in Counter(tokens).items():
+                    self._postings[term].append((index, frequency))
+
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        count = len(self.passages)
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def score(self, query):
+        """Return {passage index: BM25 score} for passages sharing at least one term with the query."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._average_length or 1))
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def select(self, queries, top_k=DEFAULT_TOP_K, token_budget=DEFAULT_TOKEN_BUDGET):
+        """
+        Pick the most relevant passages for one or more queries within a token budget.
+
+        Takes the top_k passages per query, then keeps the best-scoring ones until
+        the budget is spent.
+
+        Args:
+            queries (str or list): Summary point(s) to find evidence for
+            top_k (int): Passages considered per query
+            token_budget (int): Maximum estimated tokens of evidence
+
+        Returns:
+            dict: {article_url: [passage, ...]} in article order of appearance
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+
+        best = {}
+        for query in queries:
+            ranked = sorted(self.score(query).items(), key=lambda item: item[1], reverse=True)[:top_k]
+            for index, score in ranked:
+                best[index] = max(score, best.get(index, 0.0))
+
+        chosen, used = [], 0
+        for index in sorted(best, key=best.get, reverse=True):
+            cost = estimate_tokens(self.passages[index][1])
+            if used + cost > token_budget:
+                continue
+            chosen.append(index)
+            used += cost
+
+        evidence = {}
+        for index in sorted(chosen):
+            url, passage = self.passages[index]
+            evidence.setdefault(url, []).append(passage)
+        return evidence
+
+
+def format_evidence(evidence, articles, labels=None):
+    """Render {url: [passages]} as a prompt block, labelling each article with its URL (or the given labels)."""
+    lines = []
+    for i, url in enumerate(articles):
+        passages = (evidence or {}).get(url)
+        lines.append(f"Article {labels[i] if labels else url}:")
+        if passages:
+            lines.extend(f"- {passage}" for passage in passages)
+        else:
+            lines.append("- (no relevant passage found)")
+    return "\n".join(lines)
@@ -0,0 +1,343 @@
+"""
+Pooled article fetcher.
+Shares keep-alive connection pools and cached DNS lookups across all article downloads,
+limits concurrent requests per host and fetches batches of URLs concurrently.
+"""
+import os
+import time
+import socket
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+from concurrency import limited_call, call_slot, check_cancelled, submit_in_context
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+
+# Connection pool and concurrency limits
+POOL_CONNECTIONS = int(os.environ.get('FETCH_POOL_CONNECTIONS', 32))
+POOL_MAXSIZE = int(os.environ.get('FETCH_POOL_MAXSIZE', 16))
+MAX_PER_HOST = int(os.environ.get('FETCH_MAX_PER_HOST', 4))
+MAX_WORKERS = int(os.environ.get('FETCH_MAX_WORKERS', 16))
+BATCH_TIMEOUT = float(os.environ.get('FETCH_BATCH_TIMEOUT', 20))
+DNS_CACHE_TTL = float(os.environ.get('FETCH_DNS_CACHE_TTL', 300))
+DNS_CACHE_SIZE = int(os.environ.get('FETCH_DNS_CACHE_SIZE', 1024))
+CHUNK_SIZE = 64 * 1024
+
+# Download ceilings per kind of content; pages are truncated, PDFs (which cannot be parsed truncated) rejected
+MAX_BYTES = {
+    'html': int(os.environ.get('FETCH_MAX_HTML_BYTES', 5 * 1024 * 1024)),
+    'pdf': int(os.environ.get('FETCH_MAX_PDF_BYTES', 30 * 1024 * 1024)),
+}
+# Content types never worth downloading as article text
+DISALLOWED_TYPES = (
+    'image/', 'video/', 'audio/', 'font/', 'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/x-tar', 'application/x-7z-compressed', 'application/x-rar', 'application/vnd.rar',
+    'application/x-bzip', 'application/x-xz', 'application/x-msdownload',
+    'application/vnd.ms-excel', 'application/vnd.openxmlformats', 'application/x-iso9660-image',
+)
+# Generic binary types say nothing about the body (PDFs are often served this way), so they
+# are judged from the first bytes instead of being rejected up front
+GENERIC_TYPES = ('application/octet-stream', 'binary/octet-stream')
+
+_session = None
+_session_lock = threading.Lock()
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+_dns_cache = OrderedDict()  # (host, port) -> (expires at, addresses), least recently used first
+_dns_cache_lock = threading.Lock()
+
+
+def resolve_cached(host, port):
+    """
+    Resolve a host to its addresses, remembering the answer for DNS_CACHE_TTL seconds.
+
+    At most DNS_CACHE_SIZE hosts are kept; expired and least recently used entries are dropped first.
+
+    Returns:
+        list: Addresses in resolver order, or None if the host does not resolve
+    """
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_cache_lock:
+        cached = _dns_cache.get(key)
+        if cached and cached[0] > now:
+            _dns_cache.move_to_end(key)
+            return cached[1]
+
+    try:
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    except socket.gaierror:
+        return None
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+
+    with _dns_cache_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, addresses)
+        _dns_cache.move_to_end(key)
+        for expired in [k for k, (expires, _) in _dns_cache.items() if expires <= now]:
+            del _dns_cache[expired]
+        while len(_dns_cache) > DNS_CACHE_SIZE:
+            _dns_cache.popitem(last=False)
+    return addresses
+
+
+class _CachedDNSConnectionMixin:
+    """Opens sockets to cached addresses; TLS still verifies against the original host name."""
+
+    def _new_conn(self):
+        host = self._dns_host
+        addresses = resolve_cached(host, self.port)
+        if not addresses:
+            # Let urllib3 resolve and report the failure itself
+            return super()._new_conn()
+        error = None
+        try:
+            for address in addresses:
+                # Only the socket connect uses _dns_host; it is restored before the TLS handshake
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter whose direct connections resolve host names through the fetcher's DNS cache."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CachedDNSHTTPConnectionPool,
+            'https': _CachedDNSHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Create a requests session with keep-alive connection pools (and cached DNS) for http and https."""
+    session = requests.Session()
+    adapter_cls = CachedDNSAdapter if DNS_CACHE_TTL > 0 else HTTPAdapter
+    adapter = adapter_cls(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+def get_session():
+    """Return the process-wide article fetching session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def _host_slot(url):
+    """Return the semaphore limiting concurrent requests to the url's host."""
+    host = urlsplit(url).hostname or ''
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = threading.BoundedSemaphore(MAX_PER_HOST)
+            _host_slots[host] = slot
+        return slot
+
+
+def fetch(url, timeout=5, method='GET', **kwargs):
+    """
+    Issue a request through the shared session, respecting the per-host and global limits.
+
+    Args:
+        url (str): URL to request
+        timeout (float): Connect/read timeout in seconds
+        method (str): HTTP method
+        **kwargs: Extra arguments for requests (headers, stream, allow_redirects, ...)
+
+    Returns:
+        requests.Response: The response
+    """
+    with _host_slot(url):
+        return limited_call(get_session().request, method, url, timeout=timeout, **kwargs)
+
+
+@contextmanager
+def stream(url, timeout=5, **kwargs):
+    """
+    Open a streaming GET through the shared session.
+
+    The per-host and global slots are held until the block exits, so the body
+    download counts against the limits, and the response is always closed.
+
+    Args:
+        url (str): URL to request
+        timeout (float): Connect/read timeout in seconds
+        **kwargs: Extra arguments for requests (headers, ...)
+
+    Yields:
+        requests.Response: The response with its body not yet read
+    """
+    with _host_slot(url), call_slot():
+        response = get_session().get(url, timeout=timeout, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+
+def peek(response, size=1024):
+    """
+    Read the first bytes of a streaming response without losing them.
+
+    Args:
+        response (requests.Response): Response opened with stream=True
+        size (int): Minimum number of bytes to buffer for sniffing
+
+    Returns:
+        tuple: (head bytes, iterator over the full body starting with head)
+    """
+    chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= size:
+            break
+
+    def body():
+        if head:
+            yield head
+        yield from chunks
+
+    return head, body()
+
+
+class ContentRejected(Exception):
+    """A response was abandoned because of its content type or size."""
+
+
+def check_content_type(response):
+    """
+    Reject a response whose Content-Type is on the disallowed list before reading its body.
+
+    Raises:
+        ContentRejected: If the content type is disallowed
+    """
+    content_type = (response.headers.get('Content-Type') or '').lower()
+    if content_type.startswith(DISALLOWED_TYPES):
+        raise ContentRejected(f"Disallowed content type {content_type}")
+
+
+def is_generic_type(response):
+    """Whether the response declares a generic binary Content-Type that needs sniffing."""
+    return (response.headers.get('Content-Type') or '').lower().startswith(GENERIC_TYPES)
+
+
+def check_content_length(response, max_bytes):
+    """
+    Reject a response whose declared Content-Length exceeds max_bytes.
+
+    Raises:
+        ContentRejected: If the declared length is over the limit
+    """
+    try:
+        length = int(response.headers.get('Content-Length') or 0)
+    except ValueError:
+        return
+    if length > max_bytes:
+        raise ContentRejected(f"Content-Length {length} exceeds {max_bytes} bytes")
+
+
+def bounded(chunks, max_bytes, truncate=False):
+    """
+    Pass through body chunks until max_bytes have been read.
+
+    Args:
+        chunks: Iterable of byte chunks (e.g. from peek)
+        max_bytes (int): Byte ceiling
+        truncate (bool): Stop quietly at the ceiling instead of raising
+
+    Yields:
+        bytes: Chunks, the last one cut at the ceiling when truncating
+
+    Raises:
+        ContentRejected: If the body exceeds max_bytes and truncate is False
+    """
+    read = 0
+    for chunk in chunks:
+        if read + len(chunk) > max_bytes:
+            if not truncate:
+                raise ContentRejected(f"Body exceeds {max_bytes} bytes")
+            logger.info(f"Truncating download at {max_bytes} bytes")
+            yield chunk[:max_bytes - read]
+            return
+        read += len(chunk)
+        yield chunk
+
+
+def fetch_many(urls, fn, timeout=BATCH_TIMEOUT, max_workers=MAX_WORKERS):
+    """
+    Run fn over many URLs concurrently and yield results as they complete.
+
+    Pending work is cancelled when the batch timeout expires, the caller stops
+    iterating or the owning search is cancelled, so a consumer can break as soon
+    as it has enough results.
+
+    Args:
+        urls (list): URLs to process
+        fn: Callable taking a URL (typically one that calls fetch)
+        timeout (float): Seconds to wait for the whole batch
+        max_workers (int): Maximum threads for this batch
+
+    Yields:
+        tuple: (url, result) for each call that finished without raising
+    """
+    urls = [url for url in urls if url]
+    if not urls:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(len(urls), max_workers))
+    try:
+        futures = {submit_in_context(executor, fn, url): url for url in urls}
+        for future in as_completed(futures, timeout=timeout):
+            check_cancelled()
+            url = futures[future]
+            try:
+                yield url, future.result()
+            except Exception as e:
+                logger.warning(f"Error fetching {url}: {str(e)}")
+    except FuturesTimeoutError:
+        logger.warning(f"Fetch batch timed out after {timeout}s")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
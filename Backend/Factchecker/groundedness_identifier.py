@@ -1,11 +1,31 @@
 
 
+import os
+import re
 import requests
 import json
 import logging
 
+from concurrency import limited_call, parallel_map
+from llm_cache import cached_post_json
+from evidence_retriever import format_evidence
 
-def compute_groundedness(summary_sentence, articles: list, prompt,attribute, query):
+ENDPOINT = "https://sweden-api.openai.azure.com/openai/deployments/gpt-4o-mini-atharv/chat/completions?api-version=2024-02-15-preview"
+
+BATCH_SYSTEM_PROMPT = (
+    "You will be provided with a query, an aspect and a summary split into numbered sentences, along with the "
+    "retrieved documents as a numbered list of links; the content at each link is the evidence for that document. "
+    "Your goal is to assess the groundedness of every summary sentence against every document. Criteria:\n"
+    "        Evidence Accuracy: Does the sentence accurately reflect the content of the document?\n"
+    "        Evidence Citation: Does the sentence cite specific parts of the document?\n"
+    "        Consistency: Is the sentence consistent with the facts from the document?\n\n"
+    "  For each sentence, rate how much it can be derived (or is grounded) in each document on a scale from 0 to 5. "
+    "Respond with only a JSON object in the following format, using the given ids: "
+    "{\"sentence id\": {\"doc id\": score from 0 to 5, ..., \"doc id\": score from 0 to 5}, ...}"
+)
+
+
+def compute_groundedness(summary_sentence, articles: list, prompt,attribute, query, evidence=None):
     """
     Compute groundedness scores for articles based on summary content.
 
@@ -14,6 +34,7 @@ def compute_groundedness(summary_sentence, articles: list, prompt,attribute, que
         articles: List of article URLs
         prompt: The evaluation prompt
         query: The search query
+        evidence: Optional {article_url: [passage, ...]} to judge against instead of the bare links
 
     Returns:
         dict: Dictionary mapping article URLs to their groundedness scores
@@ -45,6 +66,8 @@ def compute_groundedness(summary_sentence, articles: list, prompt,attribute, que
                     {
                         "type": "text",
                         "text": f"query: {query},aspect:{attribute} Summary: {summary_sentence}, article_links:{articles}"
+                                + (f"\nJudge each article against its evidence passages:\n{format_evidence(evidence, articles)}"
+                                   if evidence else "")
                     }
                 ]
             },
@@ -54,15 +77,10 @@ def compute_groundedness(summary_sentence, articles: list, prompt,attribute, que
         "max_tokens": 800
     }
 
-    ENDPOINT = "https://sweden-api.openai.azure.com/openai/deployments/gpt-4o-mini-atharv/chat/completions?api-version=2024-02-15-preview"
-
     try:
-        # Make the API request
-        response = requests.post(ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-
-        # Parse the response
-        response_json = response.json()
+        # Make the API request (sampled judgments are only served from cache when LLM_CACHE_ALLOW_SAMPLED=1,
+        # and only when they parsed)
+        response_json = cached_post_json(ENDPOINT, headers, payload, store_if=_holds_score_dict)
         logger.debug(f"Received response: {response_json}")
 
         # Extract content from response
@@ -87,24 +105,7 @@ def compute_groundedness(summary_sentence, articles: list, prompt,attribute, que
                 logger.error("Parsed content is not a dictionary")
                 return {url: 0 for url in articles}
 
-            # Ensure all values are valid scores
-            validated_scores = {}
-            for url, score in scores_dict.items():
-                try:
-                    score_value = float(score)
-                    if 0 <= score_value <= 5:
-                        validated_scores[url] = score_value
-                    else:
-                        validated_scores[url] = 0
-                except (ValueError, TypeError):
-                    validated_scores[url] = 0
-
-            # Ensure all input articles have scores
-            for url in articles:
-                if url not in validated_scores:
-                    validated_scores[url] = 0
-
-            return validated_scores
+            return validate_scores(scores_dict, articles)
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON content: {e}")
@@ -116,4 +117,174 @@ def compute_groundedness(summary_sentence, articles: list, prompt,attribute, que
 
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return {url: 0 for url in articles}
\ No newline at end of file
+        return {url: 0 for url in articles}
+
+
+def _response_content(response_json):
+    return response_json['choices'][0]['message'].get('content') or ''
+
+
+def _holds_score_dict(response_json):
+    """Whether a chat response parses as the {article_url: score} object compute_groundedness expects."""
+    try:
+        return isinstance(json.loads(_response_content(response_json)), dict)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return False
+
+
+def _holds_score_matrix(response_json, num_sentences, articles):
+    """Whether a batched chat response has a parseable row for every sentence."""
+    try:
+        return None not in parse_score_matrix(_response_content(response_json), num_sentences, articles)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return False
+
+
+def validate_scores(scores_dict, articles):
+    """Clamp a {article_url: score} dict to valid 0-5 floats and fill in missing articles with 0."""
+    validated_scores = {}
+    for url, score in scores_dict.items():
+        # Accept {"score": x, "explanation": ...} objects as well as bare numbers
+        if isinstance(score, dict):
+            score = score.get("score")
+        try:
+            score_value = float(score)
+            if 0 <= score_value <= 5:
+                validated_scores[url] = score_value
+            else:
+                validated_scores[url] = 0
+        except (ValueError, TypeError):
+            validated_scores[url] = 0
+
+    # Ensure all input articles have scores
+    for url in articles:
+        if url not in validated_scores:
+            validated_scores[url] = 0
+
+    return validated_scores
+
+
+def parse_score_matrix(content, num_sentences, articles):
+    """
+    Parse a {sentence id: {doc id: score}} matrix returned by the batched evaluator.
+
+    Returns:
+        list: One {article_url: score} dict per sentence, with None for sentences missing from the response
+
+    Raises:
+        ValueError: If the content holds no JSON object
+    """
+    match = re.search(r'{.*}', content, re.DOTALL)
+    if not match:
+        raise ValueError("No JSON object in response")
+    matrix = json.loads(match.group(0))
+    if not isinstance(matrix, dict):
+        raise ValueError("Parsed content is not a dictionary")
+
+    results = []
+    for i in range(num_sentences):
+        row = matrix.get(f"s{i}")
+        if not isinstance(row, dict):
+            results.append(None)
+            continue
+        scores_dict = {}
+        for j, url in enumerate(articles):
+            if f"d{j}" in row:
+                scores_dict[url] = row[f"d{j}"]
+        results.append(validate_scores(scores_dict, articles))
+    return results
+
+
+def compute_groundedness_batch(summary_sentences: list, articles: list, prompt, attribute, query, evidence=None,
+                               concurrent=True):
+    """
+    Score every summary sentence against every article in a single LLM request.
+
+    Sentences whose row cannot be parsed from the response fall back to one
+    compute_groundedness call each.
+
+    Args:
+        summary_sentences: List of summary texts to evaluate
+        articles: List of article URLs
+        prompt: The evaluation prompt
+        attribute: The attribute or aspect being analyzed
+        query: The search query
+        evidence: Optional per-sentence list of {article_url: [passage, ...]} to judge against
+        concurrent: Whether fallback calls run in parallel (False keeps them sequential)
+
+    Returns:
+        list: One dict per sentence mapping article URLs to their groundedness scores
+    """
+    logger = logging.getLogger(__name__)
+
+    if not summary_sentences:
+        return []
+
+    API_KEY = os.environ['OPEN-AI-KEY']
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": API_KEY,
+    }
+
+    sentences_text = "\n".join(f"s{i}: {sentence}" for i, sentence in enumerate(summary_sentences))
+    docs_text = "\n".join(f"d{j}: {url}" for j, url in enumerate(articles))
+    if evidence:
+        # Merge the passages selected for each sentence into one block per article
+        merged = {}
+        for sentence_evidence in evidence:
+            for url, passages in (sentence_evidence or {}).items():
+                merged.setdefault(url, [])
+                merged[url].extend(p for p in passages if p not in merged[url])
+        labels = [f"d{j}" for j in range(len(articles))]
+        docs_text += f"\nEvidence passages:\n{format_evidence(merged, articles, labels)}"
+
+    payload = {
+        "messages": [
+            {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": BATCH_SYSTEM_PROMPT
+                    }
+                ]
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"query: {query}, aspect: {attribute}\nSummary sentences:\n{sentences_text}\nArticles:\n{docs_text}"
+                    }
+                ]
+            },
+        ],
+        "temperature": 0.7,
+        "top_p": 0.95,
+        "max_tokens": max(800, 30 * len(summary_sentences) * max(1, len(articles)))
+    }
+
+    results = [None] * len(summary_sentences)
+    try:
+        # Cached only when every sentence's row parsed
+        response_json = limited_call(cached_post_json, ENDPOINT, headers, payload,
+                                     store_if=lambda response: _holds_score_matrix(response, len(summary_sentences),
+                                                                                   articles))
+        content = response_json['choices'][0]['message'].get('content') or ''
+        logger.debug(f"Batched groundedness content to parse: {content}")
+        results = parse_score_matrix(content, len(summary_sentences), articles)
+    except (requests.RequestException, KeyError, IndexError, ValueError) as e:
+        logger.error(f"Batched groundedness scoring failed, falling back to per-sentence calls: {e}")
+
+    # Fall back to individual calls for any sentence the batched response did not cover
+    missing = [i for i, scores in enumerate(results) if scores is None]
+    if missing:
+        def score_sentence(i):
+            return limited_call(compute_groundedness, summary_sentences[i], articles, prompt, attribute, query,
+                                evidence[i] if evidence else None)
+
+        fallback = parallel_map(score_sentence, missing) if concurrent else [score_sentence(i) for i in missing]
+        for i, scores in zip(missing, fallback):
+            results[i] = scores
+
+    return results
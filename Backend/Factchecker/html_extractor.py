@@ -0,0 +1,276 @@
+"""
+Main-content HTML text extraction.
+Parses pages event by event (lxml's C parser when installed, the stdlib parser otherwise),
+drops boilerplate such as navigation, headers, footers and link lists, and stops once
+enough article text has been collected.
+"""
+import os
+import re
+import logging
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # optional fast backend
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+MAX_CHARS = int(os.environ.get('HTML_MAX_CHARS', 100000))
+DEFAULT_ENGINE = os.environ.get('HTML_EXTRACTOR', 'lxml' if etree is not None else 'stdlib')
+FEED_SIZE = 64 * 1024
+
+# Subtrees that never hold article text
+SKIP_TAGS = frozenset([
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed',
+    'nav', 'header', 'footer', 'aside', 'button', 'select', 'textarea', 'menu', 'dialog',
+])
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'figcaption', 'br', 'hr', 'body',
+])
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+MAIN_TAGS = frozenset(['article', 'main'])
+# Never dropped for their class or id, which on these often names the whole page layout
+CONTAINER_TAGS = frozenset(['html', 'body', 'article', 'main'])
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+# Matched against whole class/id/role tokens: "sidebar" and "site-header" are boilerplate,
+# layout markers such as "has-sidebar" or "header-offset" are not
+BOILERPLATE_TOKEN = re.compile(
+    r'((site|main|page|global|top|primary)[_-])?'
+    r'(nav|navbar|navigation|menu|header|footer|sidebar|breadcrumbs?|cookies?|consent|banner|advert|ads?|promo|'
+    r'share|sharing|social|related|comments?|subscribe|newsletter|popup|modal|skip)'
+    r'([_-](links?|bar|buttons?|area|box|wrapper|container|posts?|list|notice|widget))?',
+    re.IGNORECASE
+)
+
+# Blocks whose text is mostly link text are link lists, not content
+MAX_LINK_DENSITY = 0.5
+MIN_BLOCK_WORDS = 4
+# Stop parsing once this multiple of max_chars has been collected before filtering
+COLLECT_FACTOR = 3
+
+
+def _is_boilerplate(attrib):
+    tokens = f"{attrib.get('class') or ''} {attrib.get('id') or ''} {attrib.get('role') or ''}".split()
+    return any(BOILERPLATE_TOKEN.fullmatch(token) for token in tokens)
+
+
+class _BlockCollector:
+    """
+    Parser target turning start/end/data events into text blocks.
+
+    Implements the interface of lxml's parser targets; the stdlib parser is adapted to it.
+    """
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.blocks = []  # (text, link_chars, heading, in_main)
+        self.title_parts = []
+        self._stack = []  # (tag, skipped)
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._main_depth = 0
+        self._heading_depth = 0
+        self._in_title = False
+        self._parts = []
+        self._link_chars = 0
+        self._collected = 0
+
+    @property
+    def full(self):
+        return self._collected >= self.max_chars * COLLECT_FACTOR
+
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS:
+            if tag in ('br', 'hr') and not self._skip_depth:
+                self._flush()
+            return
+        skipped = tag in SKIP_TAGS or (tag not in CONTAINER_TAGS and _is_boilerplate(attrib))
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in MAIN_TAGS and self._skip_depth:
+            # The article is never dropped with a wrapper that looked like boilerplate
+            self._stack = [(open_tag, False) for open_tag, _ in self._stack]
+            self._skip_depth = 0
+        self._stack.append((tag, skipped))
+        self._skip_depth += skipped
+        self._link_depth += tag == 'a'
+        self._main_depth += tag in MAIN_TAGS
+        self._heading_depth += tag in HEADING_TAGS
+        self._in_title = self._in_title or tag == 'title'
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        # Close unclosed children (<p>, <li>, ...) along with their parent
+        while self._stack:
+            open_tag, skipped = self._stack.pop()
+            self._skip_depth -= skipped
+            self._link_depth -= open_tag == 'a'
+            self._main_depth -= open_tag in MAIN_TAGS
+            self._heading_depth -= open_tag in HEADING_TAGS
+            if open_tag == 'title':
+                self._in_title = False
+            if open_tag == tag:
+                break
+
+    def data(self, text):
+        if self._in_title:
+            self.title_parts.append(text)
+            return
+        if self._skip_depth or self.full:
+            return
+        text = text.strip()
+        if text:
+            self._parts.append(text)
+            if self._link_depth:
+                self._link_chars += len(text)
+
+    def close(self):
+        self._flush()
+        return self
+
+    def _flush(self):
+        if self._parts:
+            text = ' '.join(self._parts)
+            self.blocks.append((text, self._link_chars, bool(self._heading_depth), bool(self._main_depth)))
+            self._collected += len(text)
+        self._parts = []
+        self._link_chars = 0
+
+    def result(self):
+        """Return (main-content text, title) from the collected blocks."""
+        blocks = self.blocks
+        # Prefer <article>/<main> content when the page marks it up and it has real text
+        main_blocks = [block for block in blocks if block[3]]
+        if sum(len(block[0]) for block in main_blocks) >= 200:
+            blocks = main_blocks
+
+        content = [
+            (text, heading) for text, link_chars, heading, _ in blocks
+            if link_chars <= MAX_LINK_DENSITY * len(text) and (heading or len(text.split()) >= MIN_BLOCK_WORDS)
+        ]
+        # Very short pages may have no block that looks like content; keep all their text
+        if not any(not heading for _, heading in content):
+            content = [(text, heading) for text, _, heading, _ in blocks]
+
+        lines, length = [], 0
+        for text, _ in content:
+            lines.append(text)
+            length += len(text) + 1
+            if length >= self.max_chars:
+                break
+
+        title = ' '.join(' '.join(self.title_parts).split()) or "No title found"
+        return '\n'.join(lines)[:self.max_chars], title
+
+
+class _StdlibTarget(HTMLParser):
+    """Feeds html.parser events into a _BlockCollector."""
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+class Extraction:
+    """
+    Incremental extraction of one document.
+
+    Feed decoded HTML in pieces with feed(); once `full` is set the rest of the
+    document can be skipped. finish() returns (text, title).
+    """
+
+    def __init__(self, engine=None, max_chars=MAX_CHARS):
+        self.engine = engine or DEFAULT_ENGINE
+        self.collector = _BlockCollector(max_chars)
+        if self.engine == 'lxml':
+            if etree is None:
+                raise ValueError("The lxml extraction engine requires the lxml package")
+            self._parser = etree.HTMLParser(target=self.collector, remove_comments=True)
+        elif self.engine == 'stdlib':
+            self._parser = _StdlibTarget(self.collector)
+        else:
+            raise ValueError(f"Unknown HTML extraction engine: {self.engine}")
+
+    @property
+    def full(self):
+        return self.collector.full
+
+    def feed(self, html_text):
+        if html_text and not self.full:
+            self._parser.feed(html_text)
+
+    def finish(self):
+        try:
+            self._parser.close()
+        except Exception as e:
+            # lxml raises on documents it could not parse at all; keep whatever was collected
+            logger.debug(f"HTML parser close failed: {str(e)}")
+        self.collector.close()
+        return self.collector.result()
+
+
+def extract_soup(html_text, max_chars=MAX_CHARS):
+    """Previous extraction path: whole-page BeautifulSoup get_text, for comparison."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_text, 'html.parser')
+    title = soup.title.string if soup.title else "No title found"
+    return soup.get_text(separator="\n", strip=True)[:max_chars], title
+
+
+def extract(html_text, engine=None, max_chars=MAX_CHARS):
+    """
+    Extract the main-content text and title of an HTML document.
+
+    Args:
+        html_text (str): The decoded document
+        engine (str): 'lxml', 'stdlib' or 'soup' (defaults to HTML_EXTRACTOR)
+        max_chars (int): Maximum characters of text to return
+
+    Returns:
+        tuple: (text, title)
+    """
+    if (engine or DEFAULT_ENGINE) == 'soup':
+        return extract_soup(html_text, max_chars)
+    extraction = Extraction(engine, max_chars)
+    for start in range(0, len(html_text), FEED_SIZE):
+        extraction.feed(html_text[start:start + FEED_SIZE])
+        if extraction.full:
+            break
+    return extraction.finish()
+
+
+def extract_iter(text_chunks, engine=None, max_chars=MAX_CHARS):
+    """
+    Extract (text, title) from a document arriving as decoded text chunks.
+
+    Stops consuming chunks (and so downloading) once enough text has been collected.
+    """
+    extraction = Extraction(engine, max_chars)
+    for chunk in text_chunks:
+        extraction.feed(chunk)
+        if extraction.full:
+            break
+    return extraction.finish()
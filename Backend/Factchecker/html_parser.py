@@ -1,38 +1,135 @@
-from pdf_reader import is_pdf_link, get_text_from_pdf_url
+from pdf_reader import is_pdf_link, get_text_from_pdf_url, get_text_from_pdf_stream
 import os
 import json
+import codecs
 from googlesearch import search
 import requests
-from bs4 import BeautifulSoup
+from requests.compat import chardet
+import fetcher
+import html_extractor
+from page_cache import page_cache, conditional_headers, is_storable
+
+PDF_MAGIC = b'%PDF-'
+# Signatures of archives, images and media that are sometimes served as text/html
+BINARY_MAGIC = (b'PK\x03\x04', b'\x1f\x8b', b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'Rar!', b'7z\xbc\xaf',
+                b'BZh', b'\xfd7zXZ', b'ID3', b'OggS', b'fLaC', b'\x1aE\xdf\xa3', b'RIFF')
+
+
+def parse_html(html_text):
+    """Extract the main-content text and title of an HTML document, returning (text, title)"""
+    return html_extractor.extract(html_text)
+
 
 def scrape_html(url):
     try:
-        # Send a request to the URL with a User-Agent header
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.title.string if soup.title else "No title found"
-        return soup.prettify(), soup.get_text(separator="\n", strip=True), title
+        # Send a request to the URL through the pooled fetcher session (sets the User-Agent header)
+        response = fetcher.fetch(url, timeout=5)
+        text, title = parse_html(response.text)
+        return response.text, text, title
     except Exception as e:
         print(f"Error scraping {url}: {e}")
         return None, None, None
 
 
+def sniff_content_type(content_type, head):
+    """
+    Decide whether a response is a PDF or an HTML page.
+
+    Args:
+        content_type (str): The response Content-Type header
+        head (bytes): The first bytes of the response body
+
+    Returns:
+        str: 'pdf', 'binary' (archives, images, media) or 'html'
+    """
+    # The %PDF- marker may be preceded by junk bytes, but must appear in the first 1024
+    if 'application/pdf' in (content_type or '').lower() or PDF_MAGIC in head[:1024]:
+        return 'pdf'
+    if head.startswith(BINARY_MAGIC) or head[4:8] == b'ftyp':
+        return 'binary'
+    return 'html'
+
+
+def decode_stream(response, head, chunks):
+    """
+    Incrementally decode a streamed body the same way requests' response.text would.
+
+    The encoding comes from the response headers, or is detected from the first bytes.
+
+    Yields:
+        str: Decoded text chunks
+    """
+    encoding = response.encoding or chardet.detect(head)['encoding'] or 'utf-8'
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
 def url_to_text(first_url):
+    """
+    Download a URL once and extract its text, dispatching to the PDF or HTML extractor.
+
+    A single streaming GET is opened; its headers and first bytes decide the
+    content type, and the same stream is handed to the matching extractor.
+    Disallowed content types (images, media, archives) are abandoned before
+    their body is read, generic binary types are kept only when they sniff as
+    a PDF, pages are cut off at a byte ceiling and decoded incrementally, and
+    oversized PDFs are rejected.
+    Extracted text is kept in the page cache: fresh entries skip the network,
+    stale ones are revalidated with a conditional GET.
+
+    Args:
+        first_url (str): The article URL
+
+    Returns:
+        tuple: (extracted text, title), or None if the download failed
+    """
     try:
-        if first_url.endswith('.pdf') or is_pdf_link(first_url):
-            print(f'\tExtracting PDF content...')
-            html_content = get_text_from_pdf_url(first_url)
-            stripped_html = html_content
-        else:
-            print(f'\tExtracting WebPage content...')
-            html_content, stripped_html, title = scrape_html(first_url)
+        cached = page_cache.get(first_url) if page_cache else None
+        if cached and cached["fresh"]:
+            return cached["text"], cached["title"]
+
+        timeout = 60 if first_url.endswith('.pdf') else 5
+        with fetcher.stream(first_url, timeout=timeout, headers=conditional_headers(cached)) as response:
+            if cached and response.status_code == 304:
+                page_cache.touch(first_url)
+                return cached["text"], cached["title"]
+
+            fetcher.check_content_type(response)
+            head, body = fetcher.peek(response)
+            content_kind = sniff_content_type(response.headers.get('Content-Type'), head)
+
+            # Generic binary responses are only kept when their first bytes show a PDF
+            if content_kind == 'binary' or (content_kind == 'html' and fetcher.is_generic_type(response)):
+                raise fetcher.ContentRejected("Binary content served as a web page")
+            elif content_kind == 'pdf':
+                print(f'\tExtracting PDF content...')
+                if response.status_code != 200:
+                    raise Exception(f"Failed to retrieve the PDF file. Status code: {response.status_code}")
+                fetcher.check_content_length(response, fetcher.MAX_BYTES['pdf'])
+                stripped_html, title = get_text_from_pdf_stream(fetcher.bounded(body, fetcher.MAX_BYTES['pdf']))
+            else:
+                print(f'\tExtracting WebPage content...')
+                chunks = fetcher.bounded(body, fetcher.MAX_BYTES['html'], truncate=True)
+                stripped_html, title = html_extractor.extract_iter(decode_stream(response, head, chunks))
+
+            if page_cache and stripped_html and is_storable(response):
+                page_cache.put(first_url, stripped_html, title,
+                               response.headers.get('ETag'), response.headers.get('Last-Modified'))
     except Exception as e:
+        print(f"Error extracting {first_url}: {e}")
         return None
     return stripped_html, title
 
+
+def urls_to_text(urls, timeout=fetcher.BATCH_TIMEOUT):
+    """Extract many URLs concurrently, yielding (url, (text, title)) in completion order."""
+    return fetcher.fetch_many(urls, url_to_text, timeout=timeout)
+
 # if __name__ == '__main__':
 #     stripped_html = url_to_text('https://stackoverflow.com/questions/35497298/sql-query-for-to-find-item-with-a-specific-attribute-and-related-non-foreign-key')
 #     print()
\ No newline at end of file
@@ -1,118 +1,533 @@
 import os
+import copy
+import inspect
 import logging
 import threading
 from functools import lru_cache
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    pipeline,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer
+)
 import requests
 
+from llm_cache import llm_cache, cached_post_json, make_key, CACHE_ENABLED
+from evidence_retriever import format_evidence
+from model_manager import ModelManager, ModelBudgetError, model_footprint
+from model_loader import ModelLoader, LOAD_WAIT_TIMEOUT
+from model_resolver import resolve_model, is_on_hub, model_revision, hub_weight_files, stored_dtype_bytes
+from batch_scheduler import BatchScheduler, SchedulerClosed
+from prefix_cache import PrefixCache
+
 # Set up logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Model cache to store loaded models
-model_cache = {}
-model_load_lock = threading.Lock()
+
+
+def _empty_cuda_cache():
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+# Past key/values of shared prompt preambles, bounded by HF_PREFIX_CACHE_MB
+prefix_cache = PrefixCache()
+
+# Per-model micro-batching schedulers for local inference
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+# Per-model locks taken around every generate/forward call, so scheduler batches, streams
+# and likelihood scoring on one model run one at a time
+_run_locks = {}
+
+
+def _release_model_state(cache_key):
+    """
+    Drop what was kept for a model that was evicted or unloaded: its scheduler, its cached
+    prefix key/values (computed by, and in the dtype of, the dropped weights) and cached GPU memory.
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.pop(cache_key, None)
+        _run_locks.pop(cache_key, None)
+    if scheduler is not None:
+        scheduler.close()
+    prefix_cache.drop(cache_key)
+    _empty_cuda_cache()
+
+
+# Model cache to store loaded models, bounded by HF_MODEL_MEMORY_BUDGET_MB
+model_cache = ModelManager(on_evict=_release_model_state)
+
+# Longest wait for the next streamed token before the stream is abandoned
+STREAM_TOKEN_TIMEOUT = float(os.environ.get('HF_STREAM_TOKEN_TIMEOUT', 120))
+
+# Likelihood scoring reads the next-token probabilities of these labels
+SCORE_LABELS = "012345"
+SCORE_BATCH_SIZE = int(os.environ.get('HF_SCORE_BATCH_SIZE', 16))
+
+DEFAULT_GENERATION_PARAMS = {
+    "max_new_tokens": 512,
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "repetition_penalty": 1.1,
+    "do_sample": True
+}
 
 
 def is_valid_huggingface_model(model_name):
-    """Check if a model exists on HuggingFace Hub."""
+    """Check if a model exists on HuggingFace Hub (with a strict timeout)."""
+    return is_on_hub(model_name)
+
+
+# Config, generation config, tokenizer and index files; the weights are added per model
+DOWNLOAD_PATTERNS = ["*.json", "*.txt", "*.model", "*.tiktoken"]
+
+
+def _download_weights(model_name, files=None):
+    """
+    Fetch the model files into the local HF cache ahead of from_pretrained, when huggingface_hub is available.
+
+    Only one weight format is downloaded, safetensors when the repository has it, else the .bin
+    files, together with the config and tokenizer files.
+
+    Args:
+        model_name (str): The name of the model on HuggingFace
+        files (dict): {file name: size} of the repository, listed when not given
+
+    Returns:
+        str: The local snapshot directory, or None when from_pretrained has to download the files itself
+    """
     try:
-        api_url = f"https://huggingface.co/api/models/{model_name}"
-        response = requests.get(api_url)
-        return response.status_code == 200
+        from huggingface_hub import snapshot_download, list_repo_files
+    except ImportError:
+        # from_pretrained downloads the files itself while materializing
+        return None
+    if files is None:
+        files = dict.fromkeys(list_repo_files(model_name), 0)
+    return snapshot_download(model_name, allow_patterns=DOWNLOAD_PATTERNS + hub_weight_files(files))
+
+
+def _warm_up(text_pipeline):
+    """Run one tiny generation so the first real request does not pay for lazy initialization."""
+    try:
+        text_pipeline("Hello", max_new_tokens=1, do_sample=False)
     except Exception as e:
-        logger.error(f"Error checking model {model_name}: {str(e)}")
-        return False
+        logger.warning(f"Model warm-up failed: {str(e)}")
+
+
+# Weight precisions for load_model; fp16 is only offered on GPU and int8 only on CPU
+PRECISIONS = ('fp32', 'bf16', 'fp16', 'int8')
+# Bytes per parameter while materializing; int8 quantizes weights loaded in fp32
+PRECISION_BYTES = {"fp32": 4, "bf16": 2, "fp16": 2, "int8": 4}
+
+
+def _resolve_precision(precision, device):
+    """Validate a requested precision for a device, defaulting to fp16 on GPU and fp32 on CPU."""
+    if not precision:
+        return "fp16" if device == "cuda" else "fp32"
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision}; expected one of {', '.join(PRECISIONS)}")
+    if precision == "int8" and device == "cuda":
+        raise ValueError("int8 dynamic quantization is only available on CPU")
+    if precision == "fp16" and device != "cuda":
+        raise ValueError("fp16 is only available on GPU; use bf16 on CPU")
+    return precision
+
+
+def _materialize(source, local_only, device, precision):
+    """Load model weights at the given precision; int8 dynamically quantizes the linear layers after loading."""
+    dtype = {
+        "fp32": torch.float32,
+        "bf16": torch.bfloat16,
+        "fp16": torch.float16,
+        "int8": torch.float32,
+    }[precision]
+    model = AutoModelForCausalLM.from_pretrained(
+        source,
+        local_files_only=local_only,
+        torch_dtype=dtype,
+        device_map="auto" if device == "cuda" else None,
+        low_cpu_mem_usage=True
+    )
+    if precision == "int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model
+
+
+def _weights_in_memory(weight_bytes, path, precision):
+    """Scale the size of weight files on disk to the precision they are materialized at."""
+    stored = stored_dtype_bytes(path) if path else None
+    if not stored:
+        return weight_bytes
+    return weight_bytes * PRECISION_BYTES[precision] // stored
+
+
+def _loaded_info(cache_key, precision=None):
+    """Details of a loaded model if it matches the requested precision (any precision when none is given), else None."""
+    info = model_cache.info(cache_key)
+    if info is None or (precision and info.get("precision") != precision):
+        return None
+    return info
+
+
+def _requested_precision(cache_key, precision, use_gpu):
+    """
+    Resolve the precision a load asks for: none keeps the loaded model's precision, else the device default.
 
+    Raises:
+        ValueError: If the precision is unknown or unavailable on the device
+    """
+    if not precision:
+        loaded = model_cache.info(cache_key)
+        if loaded is not None:
+            return loaded.get("precision")
+    device = "cuda" if torch.cuda.is_available() and use_gpu else "cpu"
+    return _resolve_precision(precision, device)
 
-def load_model(model_name, model_type='generator', use_gpu=True):
+
+def _load_model(model_name, model_type='generator', use_gpu=True, progress=None, precision=None):
     """
-    Load a model from HuggingFace Hub.
+    Load a model from HuggingFace Hub into model_cache.
+
+    Runs on a model_loader worker; model_loader guarantees at most one load per model at a time.
 
     Args:
         model_name (str): The name of the model on HuggingFace
         model_type (str): Either 'generator' or 'evaluator'
         use_gpu (bool): Whether to use GPU acceleration
+        progress: Optional callable receiving the current load stage
+        precision (str): 'fp32', 'bf16', 'int8' (CPU) or 'fp16' (GPU); defaults by device
 
     Returns:
         dict: Status of model loading operation
     """
     cache_key = f"{model_type}_{model_name}"
+    progress = progress or (lambda stage: None)
 
-    # Check if model is already loaded
-    if cache_key in model_cache:
+    # Check if model is already loaded at the requested precision
+    loaded = _loaded_info(cache_key, precision)
+    if loaded is not None:
         logger.info(f"Model {model_name} already loaded for {model_type}")
-        return {"status": "success", "message": "Model already loaded", "model_id": model_name}
+        return {"status": "success", "message": "Model already loaded", "model_id": model_name,
+                "precision": loaded.get("precision")}
 
-    # Use a lock to prevent concurrent loading of the same model
-    with model_load_lock:
-        try:
-            # Verify model exists on HuggingFace
-            if not is_valid_huggingface_model(model_name):
-                return {"status": "error", "message": f"Model {model_name} not found on HuggingFace"}
-
-            logger.info(f"Loading model {model_name} for {model_type}...")
-
-            # Set device based on availability
-            device = "cuda" if torch.cuda.is_available() and use_gpu else "cpu"
-            logger.info(f"Using device: {device}")
-
-            # Load tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-
-            # Load model with appropriate settings based on type
-            if model_type == 'generator':
-                model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                    device_map="auto" if device == "cuda" else None,
-                    low_cpu_mem_usage=True
-                )
-
-                # Create text generation pipeline
-                text_generator = pipeline(
-                    "text-generation",
-                    model=model,
-                    tokenizer=tokenizer,
-                    device=0 if device == "cuda" else -1
-                )
-
-                model_cache[cache_key] = {
-                    "model": model,
-                    "tokenizer": tokenizer,
-                    "pipeline": text_generator
-                }
-
-            elif model_type == 'evaluator':
-                model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                    device_map="auto" if device == "cuda" else None,
-                    low_cpu_mem_usage=True
-                )
-
-                # Create text generation pipeline with lower temperature for evaluation
-                evaluator = pipeline(
-                    "text-generation",
-                    model=model,
-                    tokenizer=tokenizer,
-                    device=0 if device == "cuda" else -1
-                )
-
-                model_cache[cache_key] = {
-                    "model": model,
-                    "tokenizer": tokenizer,
-                    "pipeline": evaluator
-                }
-
-            logger.info(f"Successfully loaded {model_name} for {model_type}")
-            return {"status": "success", "message": "Model loaded successfully", "model_id": model_name}
+    try:
+        # Set device based on availability
+        device = "cuda" if torch.cuda.is_available() and use_gpu else "cpu"
+        precision = _resolve_precision(precision, device)
+        logger.info(f"Using device: {device}, precision: {precision}")
+
+        if cache_key in model_cache:
+            # Loaded at another precision; its weights and cached prefixes are replaced
+            logger.info(f"Reloading {model_name} for {model_type} at {precision}")
+            model_cache.remove(cache_key)
+
+        progress("resolving")
+        # Prefer complete weights already on disk; the Hub is only asked when there are none
+        resolution = resolve_model(model_name)
+        if resolution is None:
+            return {"status": "error", "message": f"Model {model_name} not found locally or on HuggingFace"}
+        source = resolution.path
+        local_only = resolution.is_local
+
+        logger.info(f"Loading model {model_name} for {model_type} from {source}...")
+
+        if not local_only:
+            progress("downloading")
+            snapshot = _download_weights(model_name, resolution.files)
+            if snapshot:
+                source, local_only = snapshot, True
+
+        # Make room before materializing, sized by the last measurement of this model or its weight
+        # files, and hold it until the model is registered so parallel loads cannot claim the same bytes
+        expected = model_cache.expected_footprint(cache_key, precision) or _weights_in_memory(
+            resolution.weight_bytes, source if local_only else None, precision)
+        if expected and not model_cache.reserve(expected, hold=cache_key):
+            return {"status": "error", "message": f"Not enough memory budget to load {model_name}; unload a model first"}
+
+        # Load tokenizer
+        tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=local_only)
+        # Batched generation pads prompts on the left so every row continues from its last token
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+
+        progress("materializing")
+        info = {"precision": precision, "device": device, "source": resolution.source,
+                "revision": model_revision(source) if local_only else None}
+
+        # Load model with appropriate settings based on type
+        if model_type == 'generator':
+            model = _materialize(source, local_only, device, precision)
+
+            # Create text generation pipeline
+            text_generator = pipeline(
+                "text-generation",
+                model=model,
+                tokenizer=tokenizer,
+                device=0 if device == "cuda" else -1
+            )
+
+            model_cache.add(cache_key, {
+                "model": model,
+                "tokenizer": tokenizer,
+                "pipeline": text_generator
+            }, model_footprint(model), info)
+
+        elif model_type == 'evaluator':
+            model = _materialize(source, local_only, device, precision)
+
+            # Create text generation pipeline with lower temperature for evaluation
+            evaluator = pipeline(
+                "text-generation",
+                model=model,
+                tokenizer=tokenizer,
+                device=0 if device == "cuda" else -1
+            )
+
+            model_cache.add(cache_key, {
+                "model": model,
+                "tokenizer": tokenizer,
+                "pipeline": evaluator
+            }, model_footprint(model), info)
+
+        progress("warming")
+        _warm_up(model_cache[cache_key]["pipeline"])
+
+        logger.info(f"Successfully loaded {model_name} for {model_type}")
+        return {"status": "success", "message": "Model loaded successfully", "model_id": model_name,
+                "precision": precision}
+
+    except ModelBudgetError as e:
+        logger.error(f"Model {model_name} does not fit in the memory budget: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+    except Exception as e:
+        logger.error(f"Failed to load model {model_name}: {str(e)}")
+        return {"status": "error", "message": f"Failed to load model: {str(e)}"}
+
+    finally:
+        # No-op once add() has replaced the held estimate with the measured footprint
+        model_cache.cancel(cache_key)
+
+
+model_loader = ModelLoader(_load_model)
 
+
+def start_model_load(model_name, model_type='generator', use_gpu=True, precision=None):
+    """
+    Start loading a model in the background, joining the load already running for it if any.
+
+    A load at another precision waits for the one in flight and then reloads the model.
+
+    Returns:
+        LoadTask: Task whose to_dict() reports the load id, stage and error
+
+    Raises:
+        ValueError: If the precision is unknown or unavailable on the device
+    """
+    cache_key = f"{model_type}_{model_name}"
+    precision = _requested_precision(cache_key, precision, use_gpu)
+    return model_loader.submit(cache_key, model_name, model_type, use_gpu=use_gpu, precision=precision)
+
+
+def get_load_status(load_id):
+    """Return the status dict of a background load, or None if the load id is unknown."""
+    task = model_loader.get(load_id)
+    return task.to_dict() if task else None
+
+
+def load_model(model_name, model_type='generator', use_gpu=True, precision=None):
+    """
+    Load a model from HuggingFace Hub and wait for it.
+
+    Args:
+        model_name (str): The name of the model on HuggingFace
+        model_type (str): Either 'generator' or 'evaluator'
+        use_gpu (bool): Whether to use GPU acceleration
+        precision (str): 'fp32', 'bf16', 'int8' (CPU) or 'fp16' (GPU); defaults by device
+
+    Returns:
+        dict: Status of model loading operation
+
+    Raises:
+        ValueError: If the precision is unknown or unavailable on the device
+    """
+    loaded = _loaded_info(f"{model_type}_{model_name}", precision)
+    if loaded is not None:
+        logger.info(f"Model {model_name} already loaded for {model_type}")
+        return {"status": "success", "message": "Model already loaded", "model_id": model_name,
+                "precision": loaded.get("precision")}
+
+    task = start_model_load(model_name, model_type, use_gpu, precision)
+    if not task.wait(LOAD_WAIT_TIMEOUT):
+        return {"status": "error", "message": f"Model {model_name} still loading after {LOAD_WAIT_TIMEOUT}s", "load_id": task.id}
+    return task.result
+
+
+def benchmark_precisions(model_name, precisions=("fp32", "bf16", "int8"), prompt="The history of the printing press",
+                         max_new_tokens=32):
+    """
+    Measure memory footprint and CPU generation speed of a model at each precision.
+
+    Models are loaded outside model_cache (one at a time) and released after measuring.
+
+    Returns:
+        list: One dict per precision with footprint_mb, load_seconds and tokens_per_second (or error)
+    """
+    import gc
+    import time
+
+    resolution = resolve_model(model_name)
+    if resolution is None:
+        raise ValueError(f"Model {model_name} not found locally or on HuggingFace")
+    tokenizer = AutoTokenizer.from_pretrained(resolution.path, local_files_only=resolution.is_local)
+    inputs = tokenizer(prompt, return_tensors="pt")
+
+    report = []
+    for precision in precisions:
+        try:
+            precision = _resolve_precision(precision, "cpu")
+            start = time.perf_counter()
+            model = _materialize(resolution.path, resolution.is_local, "cpu", precision)
+            load_seconds = time.perf_counter() - start
+
+            with torch.inference_mode():
+                # Warm-up, then a timed greedy decode of exactly max_new_tokens
+                model.generate(**inputs, max_new_tokens=1, do_sample=False)
+                start = time.perf_counter()
+                output = model.generate(**inputs, max_new_tokens=max_new_tokens, min_length=0, do_sample=False,
+                                        pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id)
+                elapsed = time.perf_counter() - start
+            generated = output.shape[-1] - inputs["input_ids"].shape[-1]
+
+            report.append({
+                "precision": precision,
+                "footprint_mb": round(model_footprint(model) / 1024 ** 2, 1),
+                "load_seconds": round(load_seconds, 2),
+                "generated_tokens": int(generated),
+                "tokens_per_second": round(generated / elapsed, 2) if elapsed > 0 else None
+            })
+            del model, output
         except Exception as e:
-            logger.error(f"Failed to load model {model_name}: {str(e)}")
-            return {"status": "error", "message": f"Failed to load model: {str(e)}"}
+            logger.error(f"Benchmarking {model_name} at {precision} failed: {str(e)}")
+            report.append({"precision": precision, "error": str(e)})
+        gc.collect()
+    return report
+
+
+def _cache_endpoint(cache_key):
+    """LLM cache namespace of a loaded model; its answers differ across precisions and revisions."""
+    info = model_cache.info(cache_key) or {}
+    return f"local:{cache_key}:{info.get('precision')}:{info.get('revision')}"
+
+
+def _wait_for_model(cache_key):
+    """Wait for a model that is still loading, so requests arriving mid-load are served instead of failing."""
+    if cache_key not in model_cache:
+        model_loader.wait(cache_key)
+
+
+def _generate_with_prefix(cache_key, bundle, prefix, prompt, params):
+    """
+    Generate for one prompt, prefilling only the part after its longest cached prefix.
+
+    The declared prefix is tokenized on its own so its token ids, and therefore its cache
+    entry, do not depend on the text that follows it.
+
+    Returns:
+        list: Pipeline-style output, [{"generated_text": ...}]
+    """
+    model = bundle["model"]
+    tokenizer = bundle["tokenizer"]
+    params = dict(params)
+    return_full_text = params.pop("return_full_text", True)
+
+    prefix_ids = tokenizer(prefix, return_tensors="pt").input_ids
+    tail_ids = tokenizer(prompt[len(prefix):], add_special_tokens=False, return_tensors="pt").input_ids
+    input_ids = torch.cat([prefix_ids, tail_ids], dim=-1).to(model.device)
+    prefix_length = prefix_ids.shape[-1]
+    ids = input_ids[0].tolist()
+
+    with torch.inference_mode():
+        # generate() needs at least one uncached token to start from
+        cached_length, past = prefix_cache.longest(cache_key, ids[:-1])
+        if cached_length < prefix_length < len(ids):
+            # Extend the longest cached prefix (or start fresh) up to the declared preamble and keep it
+            past = copy.deepcopy(past) if past is not None else None
+            past = model(input_ids[:, cached_length:prefix_length], past_key_values=past,
+                         use_cache=True).past_key_values
+            prefix_cache.put(cache_key, ids[:prefix_length], past)
+            cached_length = prefix_length
+
+        output = model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            # generate() extends the cache in place, so the cached entry is copied
+            past_key_values=copy.deepcopy(past) if cached_length else None,
+            pad_token_id=tokenizer.pad_token_id,
+            **params
+        )
+
+    generated_text = tokenizer.decode(output[0, input_ids.shape[-1]:], skip_special_tokens=True)
+    return [{"generated_text": prompt + generated_text if return_full_text else generated_text}]
+
+
+def _run_lock(cache_key):
+    """Lock serializing the inference calls of one model."""
+    with _schedulers_lock:
+        return _run_locks.setdefault(cache_key, threading.Lock())
+
+
+def _run_pipeline_batch(cache_key, prompts, params):
+    """Run one padded batch of prompts through a model's pipeline, returning one output list per prompt."""
+    # Mark the model busy so it cannot be evicted mid-batch
+    with model_cache.use(cache_key) as bundle, _run_lock(cache_key):
+        params = dict(params)
+        if params.pop("prefix_cache", False):
+            # Items are (prefix, prompt) pairs; each resumes from its cached preamble
+            return [_generate_with_prefix(cache_key, bundle, prefix, prompt, params) for prefix, prompt in prompts]
+        if len(prompts) == 1:
+            return [bundle["pipeline"](prompts[0], **params)]
+        return bundle["pipeline"](prompts, batch_size=len(prompts), **params)
+
+
+def get_scheduler(cache_key):
+    """Return the micro-batching scheduler of a loaded model, creating it on first use."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(cache_key)
+        if scheduler is None:
+            scheduler = BatchScheduler(
+                lambda prompts, params: _run_pipeline_batch(cache_key, prompts, params),
+                name=cache_key
+            )
+            _schedulers[cache_key] = scheduler
+        return scheduler
+
+
+def run_inference(cache_key, prompt, params, prefix=None):
+    """
+    Generate for one prompt through the model's scheduler, batched with concurrent compatible requests.
+
+    When the prompt starts with a shared preamble (prefix), the preamble's key/values are taken
+    from prefix_cache instead of being prefilled again; such requests run one at a time.
+    """
+    if prefix and prefix_cache.enabled and prompt.startswith(prefix) and len(prompt) > len(prefix):
+        item, params = (prefix, prompt), {**params, "prefix_cache": True}
+    else:
+        item = prompt
+    try:
+        return get_scheduler(cache_key).run(item, params)
+    except SchedulerClosed:
+        # The model was evicted or reloaded after its scheduler was looked up; retry on the current one
+        return get_scheduler(cache_key).run(item, params)
 
 
 def unload_model(model_name, model_type='generator'):
@@ -121,15 +536,9 @@ def unload_model(model_name, model_type='generator'):
 
     if cache_key in model_cache:
         try:
-            # Delete the model and references to free up memory
-            del model_cache[cache_key]
-            # Force garbage collection
-            import gc
-            gc.collect()
-
-            # Clear CUDA cache if available
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+            # Delete the model and references to free up memory (garbage collects, closes its scheduler,
+            # drops its cached prefixes and clears the CUDA cache)
+            model_cache.remove(cache_key)
 
             logger.info(f"Unloaded model {model_name} for {model_type}")
             return {"status": "success", "message": "Model unloaded successfully"}
@@ -144,13 +553,18 @@ def get_available_models(model_type=None):
     """Get a list of currently loaded models."""
     models = []
 
-    for key, _ in model_cache.items():
+    for key, accounting in model_cache.describe().items():
         type_prefix, model_name = key.split('_', 1)
         if model_type is None or type_prefix == model_type:
+            with _schedulers_lock:
+                scheduler = _schedulers.get(key)
             models.append({
                 "id": model_name,
                 "type": type_prefix,
-                "is_loaded": True
+                "is_loaded": True,
+                **accounting,
+                "batching": scheduler.stats() if scheduler else None,
+                "prefix_cache": prefix_cache.stats(key)
             })
 
     return models
@@ -170,28 +584,16 @@ def generate_text(model_name, prompt, params=None):
     """
     cache_key = f"generator_{model_name}"
 
+    _wait_for_model(cache_key)
     if cache_key not in model_cache:
         raise ValueError(f"Model {model_name} not loaded. Please load it first.")
 
-    # Default parameters
-    default_params = {
-        "max_new_tokens": 512,
-        "temperature": 0.7,
-        "top_p": 0.95,
-        "repetition_penalty": 1.1,
-        "do_sample": True
-    }
-
     # Override defaults with provided params
-    if params:
-        default_params.update(params)
+    default_params = {**DEFAULT_GENERATION_PARAMS, **(params or {})}
 
     try:
-        generator = model_cache[cache_key]["pipeline"]
-        result = generator(
-            prompt,
-            **default_params
-        )
+        # Concurrent requests with the same parameters share one batched generate call
+        result = run_inference(cache_key, prompt, default_params)
 
         # Extract the generated text from the result
         generated_text = result[0]['generated_text']
@@ -206,7 +608,190 @@ def generate_text(model_name, prompt, params=None):
         raise
 
 
-def evaluate_groundedness(model_name, summary_text, articles, query, attribute):
+class _StopOnEvent(StoppingCriteria):
+    """Stops generation once the consumer of a stream has gone away."""
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.event.is_set()
+
+
+def stream_text(model_name, prompt, params=None):
+    """
+    Generate text using a loaded model, yielding text pieces as tokens are decoded.
+
+    Generation runs on a separate thread feeding a TextIteratorStreamer, so the first piece
+    arrives after prompt prefill instead of after the whole decode. Closing the generator
+    stops generation at the next token.
+
+    Args:
+        model_name (str): The name of the loaded model
+        prompt (str): The prompt for text generation
+        params (dict): Parameters for generation like max_new_tokens, temperature, etc.
+
+    Yields:
+        str: Newly generated text, without the prompt
+    """
+    cache_key = f"generator_{model_name}"
+
+    _wait_for_model(cache_key)
+    if cache_key not in model_cache:
+        raise ValueError(f"Model {model_name} not loaded. Please load it first.")
+
+    generation_params = {**DEFAULT_GENERATION_PARAMS, **(params or {})}
+    # Pipeline-only options have no meaning for model.generate
+    generation_params.pop("return_full_text", None)
+
+    stop = threading.Event()
+    errors = []
+    run_lock = _run_lock(cache_key)
+
+    # Streams bypass the batch scheduler, so mark the model busy for the whole stream
+    with model_cache.use(cache_key) as bundle:
+        model = bundle["model"]
+        tokenizer = bundle["tokenizer"]
+        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+        generation_params.setdefault("pad_token_id", tokenizer.pad_token_id)
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                        timeout=STREAM_TOKEN_TIMEOUT)
+
+        def generate():
+            try:
+                # Waits for the scheduler's batch (or another stream) on this model to finish
+                with run_lock, torch.inference_mode():
+                    model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_StopOnEvent(stop)]),
+                        **generation_params
+                    )
+            except Exception as e:
+                logger.error(f"Error streaming text with {model_name}: {str(e)}")
+                errors.append(e)
+                # Unblock the consumer
+                streamer.end()
+
+        worker = threading.Thread(target=generate, name=f"stream-{cache_key}", daemon=True)
+        worker.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            stop.set()
+            worker.join()
+
+    if errors:
+        raise errors[0]
+
+
+def _score_label_ids(tokenizer):
+    """Token ids spelling each score label, both bare and after a space (BPE vocabularies differ)."""
+    label_ids = []
+    for label in SCORE_LABELS:
+        variants = {tokenizer.encode(text, add_special_tokens=False)[-1] for text in (label, " " + label)}
+        label_ids.append(sorted(variants))
+    return label_ids
+
+
+def _last_logits_kwargs(model):
+    """Ask the model for last-position logits only, when its forward supports it."""
+    parameters = inspect.signature(model.forward).parameters
+    for name in ("logits_to_keep", "num_logits_to_keep"):
+        if name in parameters:
+            return {name: 1}
+    return {}
+
+
+def _expected_scores(cache_key, prompts):
+    """
+    Score prompts ending in "Score:" by one forward pass per batch, without decoding.
+
+    Returns:
+        list: Expected score (0-5) per prompt, from the next-token probabilities of the labels
+    """
+    scores = []
+    with model_cache.use(cache_key) as bundle:
+        model = bundle["model"]
+        tokenizer = bundle["tokenizer"]
+        label_ids = _score_label_ids(tokenizer)
+        values = torch.arange(len(SCORE_LABELS), dtype=torch.float32)
+        logits_kwargs = _last_logits_kwargs(model)
+
+        for start in range(0, len(prompts), SCORE_BATCH_SIZE):
+            # Prompts are padded on the left, so the last position is the next token for every row
+            batch = tokenizer(prompts[start:start + SCORE_BATCH_SIZE], return_tensors="pt", padding=True).to(model.device)
+            position_ids = (batch["attention_mask"].cumsum(-1) - 1).clamp(min=0)
+            with _run_lock(cache_key), torch.inference_mode():
+                logits = model(**batch, position_ids=position_ids, **logits_kwargs).logits[:, -1, :].float()
+            probs = torch.softmax(logits, dim=-1).cpu()
+            label_probs = torch.stack([probs[:, ids].sum(dim=-1) for ids in label_ids], dim=-1)
+            label_probs = label_probs / label_probs.sum(dim=-1, keepdim=True).clamp(min=1e-12)
+            scores.extend(round(score, 2) for score in (label_probs * values).sum(dim=-1).tolist())
+    return scores
+
+
+def score_groundedness_pairs(model_name, pairs, query, attribute):
+    """
+    Score (summary, article) pairs by the evaluator's probabilities for the scores 0-5.
+
+    Builds one prompt per pair and reads the distribution over the score labels at the
+    next token, so there is no decoding loop and nothing to parse. All pairs are scored
+    in batched forward passes; scores are cached by prompt in the LLM cache.
+
+    Args:
+        model_name (str): The name of the loaded evaluator model
+        pairs (list): (summary_text, article_url, evidence) triples; evidence is an optional
+            {article_url: [passage, ...]} dict
+        query (str): The original search query
+        attribute (str): The attribute or aspect being analyzed
+
+    Returns:
+        list: Expected groundedness score (0-5) per pair
+    """
+    cache_key = f"evaluator_{model_name}"
+
+    _wait_for_model(cache_key)
+    if cache_key not in model_cache:
+        raise ValueError(f"Evaluator model {model_name} not loaded. Please load it first.")
+
+    preamble = (
+        f"You will evaluate whether an article supports a summary. "
+        f"Score from 0 to 5 where 0 means not grounded at all and 5 means fully grounded. "
+        f"Answer with a single digit.\n\n"
+        f"Query: {query}\n"
+        f"Aspect: {attribute}\n"
+    )
+    prompts = [
+        preamble
+        + f"Summary: {summary_text}\n"
+        + (format_evidence(evidence, [url]) if evidence else f"Article: {url}")
+        + "\n\nScore:"
+        for summary_text, url, evidence in pairs
+    ]
+
+    endpoint = f"{_cache_endpoint(cache_key)}:likelihood"
+    keys = [make_key(endpoint, prompt, {"labels": SCORE_LABELS}) for prompt in prompts]
+    scores = [None] * len(prompts)
+    if CACHE_ENABLED:
+        for i, key in enumerate(keys):
+            cached = llm_cache.get(key)
+            if cached is not None:
+                scores[i] = cached[0]
+
+    missing = [i for i, score in enumerate(scores) if score is None]
+    if missing:
+        computed = _expected_scores(cache_key, [prompts[i] for i in missing])
+        for i, score in zip(missing, computed):
+            scores[i] = score
+            if CACHE_ENABLED:
+                llm_cache.put(keys[i], score)
+    return scores
+
+
+def evaluate_groundedness(model_name, summary_text, articles, query, attribute, evidence=None, mode="generate"):
     """
     Evaluate groundedness of a summary against source articles.
 
@@ -216,36 +801,56 @@ def evaluate_groundedness(model_name, summary_text, articles, query, attribute):
         articles (list): List of article URLs
         query (str): The original search query
         attribute (str): The attribute or aspect being analyzed
+        evidence (dict): Optional {article_url: [passage, ...]} to judge against instead of the bare links
+        mode (str): 'generate' (free-text JSON answer) or 'likelihood' (score label probabilities)
 
     Returns:
         dict: Groundedness scores for each article
     """
     cache_key = f"evaluator_{model_name}"
 
+    _wait_for_model(cache_key)
     if cache_key not in model_cache:
         raise ValueError(f"Evaluator model {model_name} not loaded. Please load it first.")
 
-    try:
-        evaluator = model_cache[cache_key]["pipeline"]
+    if mode == "likelihood":
+        try:
+            scores = score_groundedness_pairs(model_name, [(summary_text, url, evidence) for url in articles],
+                                              query, attribute)
+            return dict(zip(articles, scores))
+        except Exception as e:
+            logger.error(f"Error scoring groundedness with {model_name}: {str(e)}")
+            return {url: 0 for url in articles}
 
-        # Construct the prompt for groundedness evaluation
-        prompt = (
+    try:
+        # Construct the prompt for groundedness evaluation. Everything shared by the summary points
+        # of an attribute comes first, so its key/values are reused from the prefix cache
+        preamble = (
             f"You will evaluate the groundedness of a summary based on articles. "
             f"Score each article from 0 to 5 where 0 means not grounded at all and 5 means fully grounded.\n\n"
             f"Query: {query}\n"
             f"Aspect: {attribute}\n"
-            f"Summary: {summary_text}\n"
-            f"Articles: {articles}\n\n"
-            f"Provide your evaluation as a JSON with article URLs as keys and scores as values:\n"
+            f"Articles: {articles}\n"
+        )
+        prompt = (
+            preamble
+            + f"Summary: {summary_text}\n\n"
+            + (f"Evidence passages:\n{format_evidence(evidence, articles)}\n\n" if evidence else "")
+            + f"Provide your evaluation as a JSON with article URLs as keys and scores as values:\n"
         )
 
-        # Generate evaluation
-        result = evaluator(
+        # Generate evaluation (greedy decoding, so identical prompts are served from the LLM cache)
+        eval_params = {
+            "max_new_tokens": 128,
+            "temperature": 0.3,
+            "do_sample": False,
+            "return_full_text": False
+        }
+        result = llm_cache.get_or_compute(
+            _cache_endpoint(cache_key),
             prompt,
-            max_new_tokens=128,
-            temperature=0.3,
-            do_sample=False,
-            return_full_text=False
+            eval_params,
+            lambda: run_inference(cache_key, prompt, eval_params, prefix=preamble)
         )
 
         # Extract the generated text
@@ -314,10 +919,8 @@ def generate_text_api(model_name, prompt, api_key, params=None):
         payload["parameters"].update(params)
 
     try:
-        response = requests.post(API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-
-        result = response.json()
+        # Sampled generations are only served from cache when LLM_CACHE_ALLOW_SAMPLED=1
+        result = cached_post_json(API_URL, headers, payload)
 
         # The API response format can vary - handle different formats
         if isinstance(result, list) and result:
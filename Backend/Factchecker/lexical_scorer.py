@@ -0,0 +1,145 @@
+"""
+Lexical groundedness pre-scorer.
+First tier of the groundedness evaluation cascade: scores summary sentences against article
+text from n-gram recall and entity/number matching, settles the clear-cut pairs locally and
+leaves only the uncertain middle band for the LLM evaluator.
+"""
+import os
+import re
+import logging
+
+import numpy as np
+
+from evidence_retriever import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+LOW_THRESHOLD = float(os.environ.get('GROUNDEDNESS_LEXICAL_LOW', 1.0))
+HIGH_THRESHOLD = float(os.environ.get('GROUNDEDNESS_LEXICAL_HIGH', 4.0))
+
+# Weights of unigram recall, bigram recall and entity/number recall in the 0-5 score
+FEATURE_WEIGHTS = np.array([0.35, 0.4, 0.25])
+
+TIER_LEXICAL = "lexical"
+TIER_LLM = "llm"
+
+
+def _words(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def _content_unigrams(words):
+    return {word for word in words if word not in STOPWORDS}
+
+
+def _bigrams(words):
+    return set(zip(words, words[1:]))
+
+
+def _entities(text):
+    """Numbers and capitalized names, normalized for matching."""
+    numbers = {number.replace(',', '') for number in re.findall(r'\d[\d,]*(?:\.\d+)?', text)}
+    # Capitalized words in mid-sentence position
+    names = {match.lower() for match in re.findall(r'(?<=[a-z,;:]\s)[A-Z][a-zA-Z]+', text)}
+    return numbers | names
+
+
+class LexicalScorer:
+    """
+    Scores sentences against a fixed set of articles.
+
+    Article n-grams are extracted once into boolean article-by-term matrices, so scoring a
+    sentence against every article is a column lookup and a row sum.
+    """
+
+    def __init__(self, urls, texts):
+        """
+        Args:
+            urls (list): Article URLs
+            texts (list): Extracted article text, aligned with urls
+        """
+        self.urls = list(urls)
+        texts = (list(texts) + [''] * len(self.urls))[:len(self.urls)]
+        grams = []
+        for text in texts:
+            words = _words(text or '')
+            grams.append((_content_unigrams(words), _bigrams(words), _entities(text or '')))
+
+        # One vocabulary and membership matrix per feature: unigrams, bigrams, entities
+        self._vocabularies, self._matrices = [], []
+        for feature in range(3):
+            vocabulary = {}
+            for article_grams in grams:
+                for gram in article_grams[feature]:
+                    vocabulary.setdefault(gram, len(vocabulary))
+            matrix = np.zeros((len(self.urls), len(vocabulary)), dtype=bool)
+            for row, article_grams in enumerate(grams):
+                matrix[row, [vocabulary[gram] for gram in article_grams[feature]]] = True
+            self._vocabularies.append(vocabulary)
+            self._matrices.append(matrix)
+
+        # Articles without text cannot be judged lexically
+        self.has_text = np.array([bool(article_grams[0]) for article_grams in grams], dtype=bool)
+
+    def features(self, sentence):
+        """
+        Recall of the sentence's content unigrams, bigrams and entities/numbers in every article.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(urls), 3) with values in [0, 1]
+        """
+        words = _words(sentence)
+        sentence_grams = (_content_unigrams(words), _bigrams(words), _entities(sentence))
+        matrix = np.zeros((len(self.urls), 3))
+        for feature, grams in enumerate(sentence_grams):
+            if not grams:
+                # A sentence with no names or numbers is judged on its words alone
+                matrix[:, feature] = matrix[:, 0] if feature == 2 else 0.0
+                continue
+            columns = [self._vocabularies[feature][gram] for gram in grams if gram in self._vocabularies[feature]]
+            matrix[:, feature] = self._matrices[feature][:, columns].sum(axis=1) / len(grams)
+        return matrix
+
+    def score(self, sentence):
+        """Return the 0-5 lexical groundedness of a sentence against every article, aligned with urls."""
+        return np.round(self.features(sentence) @ FEATURE_WEIGHTS * 5.0, 1)
+
+
+def cascade_scores(sentences, scorer, escalate_fn, low=LOW_THRESHOLD, high=HIGH_THRESHOLD):
+    """
+    Score sentences lexically and escalate only uncertain sentence-article pairs.
+
+    A pair is final when its lexical score is at most `low` or at least `high`; pairs in
+    between, and articles without text, are sent to the LLM tier.
+
+    Args:
+        sentences (list): Summary sentences
+        scorer (LexicalScorer): Scorer over the attribute's articles
+        escalate_fn: Callable taking [(sentence index, [article urls]), ...] and returning one
+            {article_url: score} dict per entry
+        low (float): Scores at or below this are final
+        high (float): Scores at or above this are final
+
+    Returns:
+        tuple: (list of {article_url: score}, list of {article_url: tier}) aligned with sentences
+    """
+    results, tiers, escalations = [], [], []
+    for i, sentence in enumerate(sentences):
+        lexical = scorer.score(sentence)
+        confident = scorer.has_text & ((lexical <= low) | (lexical >= high))
+        results.append({url: float(lexical[j]) for j, url in enumerate(scorer.urls) if confident[j]})
+        tiers.append({url: TIER_LEXICAL for url in results[i]})
+        uncertain = [url for j, url in enumerate(scorer.urls) if not confident[j]]
+        if uncertain:
+            escalations.append((i, uncertain))
+
+    if escalations:
+        for (i, urls), scores in zip(escalations, escalate_fn(escalations)):
+            for url in urls:
+                results[i][url] = (scores or {}).get(url, 0)
+                tiers[i][url] = TIER_LLM
+
+    pairs = len(sentences) * len(scorer.urls)
+    escalated = sum(len(urls) for _, urls in escalations)
+    logger.info(f"Lexical groundedness settled {pairs - escalated}/{pairs} pairs, escalated {escalated} to the LLM")
+    return results, tiers
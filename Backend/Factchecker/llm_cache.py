@@ -0,0 +1,205 @@
+"""
+Content-addressed cache for LLM generations and judgments.
+Responses are keyed by a hash of (endpoint/model, messages, decoding params) and kept in an
+in-memory LRU tier backed by an on-disk SQLite tier, both subject to a TTL.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', '1') != '0'
+DISK_ENABLED = os.environ.get('LLM_CACHE_DISK', '1') != '0'
+CACHE_PATH = os.environ.get('LLM_CACHE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'coragen', 'llm.sqlite3'))
+MAX_MEMORY_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 2048))
+TTL_SECONDS = float(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))
+ALLOW_SAMPLED = os.environ.get('LLM_CACHE_ALLOW_SAMPLED', '0') == '1'
+
+
+def make_key(endpoint, messages, params):
+    """Hash the parts of a request that determine its output (never headers or API keys)."""
+    material = json.dumps({"endpoint": endpoint, "messages": messages, "params": params},
+                          sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def is_sampled(params):
+    """Whether decoding params make the output random (temperature > 0 with sampling on)."""
+    if params.get('do_sample') is False:
+        return False
+    return float(params.get('temperature', 1.0)) > 0
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) TTL cache with hit-rate and tokens-saved counters."""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_MEMORY_ENTRIES, ttl=TTL_SECONDS,
+                 disk=DISK_ENABLED, allow_sampled=ALLOW_SAMPLED):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = disk
+        self.allow_sampled = allow_sampled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "skipped": 0, "tokens_saved": 0}
+
+    def _connection(self):
+        """The open database, or None after turning the disk tier off because it could not be opened."""
+        if self._conn is None and self.disk:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, tokens INTEGER, created_at REAL)')
+                self._conn = conn
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"LLM cache disk tier disabled, cannot open {self.path}: {str(e)}")
+                self.disk = False
+        return self._conn
+
+    def get(self, key):
+        """Return (value, tokens) for a live entry, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[2] < self.ttl:
+                self._memory.move_to_end(key)
+                self._record_hit("memory_hits", entry[1])
+                return entry[0], entry[1]
+
+            conn = self._connection() if self.disk else None
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        'SELECT value, tokens, created_at FROM responses WHERE key = ?', (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM cache disk read failed: {str(e)}")
+                    row = None
+                if row and now - row[2] < self.ttl:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1], row[2])
+                    self._record_hit("disk_hits", row[1])
+                    return value, row[1]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, value, tokens=0):
+        """Store a JSON-serializable response and the number of tokens it cost."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, tokens or 0, now)
+            conn = self._connection() if self.disk else None
+            if conn is not None:
+                try:
+                    conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                                 (key, json.dumps(value), tokens or 0, now))
+                    conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM cache disk write failed: {str(e)}")
+
+    def _remember(self, key, value, tokens, created_at):
+        self._memory[key] = (value, tokens, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _record_hit(self, tier, tokens):
+        self._stats["hits"] += 1
+        self._stats[tier] += 1
+        self._stats["tokens_saved"] += tokens or 0
+
+    def get_or_compute(self, endpoint, messages, params, compute_fn, allow_sampled=None, tokens_fn=None,
+                       store_if=None):
+        """
+        Return a cached response or compute and store it.
+
+        Args:
+            endpoint (str): Endpoint URL or local model identifier
+            messages: Prompt or chat messages
+            params (dict): Decoding parameters
+            compute_fn: Zero-argument callable producing the response on a miss
+            allow_sampled (bool): Cache even when params sample (defaults to LLM_CACHE_ALLOW_SAMPLED)
+            tokens_fn: Optional callable returning the token cost of a response
+            store_if: Optional predicate on a response; responses it rejects (e.g. unparseable
+                judgments) are returned but not cached
+
+        Returns:
+            The (possibly cached) response
+        """
+        allow_sampled = self.allow_sampled if allow_sampled is None else allow_sampled
+        if not CACHE_ENABLED or (is_sampled(params) and not allow_sampled):
+            with self._lock:
+                self._stats["skipped"] += 1
+            return compute_fn()
+
+        key = make_key(endpoint, messages, params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached[0]
+
+        value = compute_fn()
+        if store_if is None or store_if(value):
+            self.put(key, value, tokens_fn(value) if tokens_fn else 0)
+        return value
+
+    def stats(self):
+        """Return hit/miss counters, hit rate and tokens saved."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._memory),
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
+
+
+llm_cache = LLMCache()
+
+
+def _usage_tokens(response_json):
+    usage = response_json.get('usage') if isinstance(response_json, dict) else None
+    return (usage or {}).get('total_tokens', 0)
+
+
+def cached_post_json(endpoint, headers, payload, allow_sampled=None, store_if=None):
+    """
+    POST a JSON payload to an LLM endpoint through the cache.
+
+    Args:
+        endpoint (str): Endpoint URL (includes the deployment/model)
+        headers (dict): Request headers; not part of the cache key
+        payload (dict): Request body; 'messages' or 'inputs' is the prompt, everything else decoding params
+        allow_sampled (bool): Cache even when the payload samples
+        store_if: Optional predicate on the decoded response deciding whether it is cached
+
+    Returns:
+        The decoded JSON response
+
+    Raises:
+        requests.RequestException: If the request fails
+    """
+    messages = payload.get('messages', payload.get('inputs'))
+    params = {k: v for k, v in payload.items() if k not in ('messages', 'inputs')}
+    # HF Inference API nests decoding params one level down
+    params = {**params.pop('parameters', {}), **params}
+
+    def call():
+        response = requests.post(endpoint, headers=headers, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    return llm_cache.get_or_compute(endpoint, messages, params, call,
+                                    allow_sampled=allow_sampled, tokens_fn=_usage_tokens, store_if=store_if)
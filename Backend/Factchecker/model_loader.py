@@ -0,0 +1,152 @@
+"""
+Background model loading with a per-model single-flight latch.
+Each model loads on its own worker thread, so independent models load in parallel, while
+concurrent requests for the same model share one load and can wait for it to finish. A
+request for the same model with other load options runs after the load in flight.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MAX_PARALLEL_LOADS = int(os.environ.get('HF_MAX_PARALLEL_LOADS', 2))
+LOAD_WAIT_TIMEOUT = float(os.environ.get('HF_LOAD_WAIT_TIMEOUT', 600))
+LOAD_TTL_SECONDS = float(os.environ.get('HF_LOAD_TTL', 3600))
+
+LOAD_STAGES = ["queued", "resolving", "downloading", "materializing", "warming", "ready", "failed"]
+
+
+class LoadTask:
+    """Progress and outcome of loading one model."""
+
+    def __init__(self, key, model_name, model_type, load_kwargs=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.model_name = model_name
+        self.model_type = model_type
+        self.load_kwargs = load_kwargs or {}
+        self.stage = "queued"
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.done = threading.Event()
+
+    def set_stage(self, stage):
+        """Progress callback handed to the load function."""
+        self.stage = stage
+        self.updated_at = time.time()
+        logger.info(f"Loading {self.key}: {stage}")
+
+    def finish(self, result):
+        self.result = result
+        if result.get("status") == "success":
+            self.stage = "ready"
+        else:
+            self.stage = "failed"
+            self.error = result.get("message")
+        self.updated_at = time.time()
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """Block until the load finishes; returns whether it did within the timeout."""
+        return self.done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "load_id": self.id,
+            "model_id": self.model_name,
+            "model_type": self.model_type,
+            "stage": self.stage,
+            "done": self.done.is_set(),
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class ModelLoader:
+    """Runs model loads in the background, at most one per model key at a time."""
+
+    def __init__(self, load_fn, max_workers=MAX_PARALLEL_LOADS, ttl=LOAD_TTL_SECONDS):
+        """
+        Args:
+            load_fn: Callable(model_name, model_type, progress=..., **load_kwargs) returning a status dict
+            max_workers: Number of models loaded concurrently; further loads queue
+            ttl: Seconds to keep finished loads for status polling
+        """
+        self.load_fn = load_fn
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='model-load')
+        self._tasks = {}  # load id -> LoadTask
+        self._in_flight = {}  # model key -> latest unfinished LoadTask
+        self._lock = threading.Lock()
+
+    def submit(self, key, model_name, model_type, **load_kwargs):
+        """
+        Start loading a model, or join the load already in flight for it.
+
+        A load with different options (e.g. another precision) is queued behind the one in
+        flight, so one model never loads twice at the same time.
+        """
+        with self._lock:
+            self._expire()
+            previous = self._in_flight.get(key)
+            if previous is not None and previous.load_kwargs == load_kwargs:
+                return previous
+            task = LoadTask(key, model_name, model_type, load_kwargs)
+            self._tasks[task.id] = task
+            self._in_flight[key] = task
+        self._executor.submit(self._run, task, previous)
+        return task
+
+    def get(self, load_id):
+        with self._lock:
+            return self._tasks.get(load_id)
+
+    def in_flight(self, key):
+        """The unfinished load of a model, or None."""
+        with self._lock:
+            return self._in_flight.get(key)
+
+    def wait(self, key, timeout=LOAD_WAIT_TIMEOUT):
+        """
+        Wait for an in-flight load of a model, if any.
+
+        Returns:
+            LoadTask: The finished task, or None if no load was in flight
+
+        Raises:
+            TimeoutError: If the load is still running after timeout seconds
+        """
+        task = self.in_flight(key)
+        if task is None:
+            return None
+        if not task.wait(timeout):
+            raise TimeoutError(f"Model {task.model_name} still loading after {timeout}s")
+        return task
+
+    def _run(self, task, previous):
+        # The executor starts tasks in submission order, so the previous load is running or done
+        if previous is not None:
+            previous.wait()
+        try:
+            result = self.load_fn(task.model_name, task.model_type, progress=task.set_stage, **task.load_kwargs)
+        except Exception as e:
+            logger.error(f"Loading {task.key} failed: {str(e)}", exc_info=True)
+            result = {"status": "error", "message": f"Failed to load model: {str(e)}"}
+        with self._lock:
+            if self._in_flight.get(task.key) is task:
+                del self._in_flight[task.key]
+        task.finish(result)
+
+    def _expire(self):
+        now = time.time()
+        expired = [load_id for load_id, task in self._tasks.items()
+                   if task.done.is_set() and now - task.updated_at > self.ttl]
+        for load_id in expired:
+            del self._tasks[load_id]
@@ -0,0 +1,263 @@
+"""
+Memory-budgeted registry of loaded HuggingFace models.
+Tracks each model's parameter and buffer footprint, last use and hit count, and evicts the
+least-recently-used idle model when a new load would exceed the RAM budget.
+"""
+import os
+import gc
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _physical_memory():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return 16 * 1024 ** 3
+
+
+# Defaults to 75% of physical memory
+MEMORY_BUDGET_BYTES = int(float(os.environ.get('HF_MODEL_MEMORY_BUDGET_MB', 0)) * 1024 ** 2) or int(_physical_memory() * 0.75)
+
+
+def _tensors(value):
+    if hasattr(value, 'numel'):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _tensors(item)
+
+
+def model_footprint(model):
+    """
+    Bytes held by a torch module's parameters and buffers, counting tied tensors once.
+
+    The state dict is included so that dynamically quantized linear layers, whose packed
+    int8 weights are neither parameters nor buffers, are counted too.
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    if hasattr(model, 'state_dict'):
+        tensors += [tensor for value in model.state_dict().values() for tensor in _tensors(value)]
+
+    seen = set()
+    total = 0
+    for tensor in tensors:
+        try:
+            key = (tensor.data_ptr(), tensor.numel())
+        except (RuntimeError, AttributeError):
+            key = id(tensor)
+        if key in seen:
+            continue
+        seen.add(key)
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelBudgetError(MemoryError):
+    """A model does not fit in the memory budget even after evicting every idle model."""
+
+
+class ModelEntry:
+    """A loaded model bundle with its accounting data."""
+
+    def __init__(self, key, bundle, footprint, info=None):
+        self.key = key
+        self.bundle = bundle
+        self.footprint = footprint
+        self.info = info or {}
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+        self.active = 0
+
+    def to_dict(self):
+        return {
+            **self.info,
+            "footprint_bytes": self.footprint,
+            "footprint_mb": round(self.footprint / 1024 ** 2, 1),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "hits": self.hits,
+            "in_use": self.active
+        }
+
+
+class ModelManager:
+    """
+    LRU registry of loaded models under a RAM budget.
+
+    Supports the dict operations the handlers use (`in`, `[]`, `del`, keys()), plus use()
+    to mark a model busy while it serves a request; busy models are never evicted.
+    """
+
+    def __init__(self, budget_bytes=MEMORY_BUDGET_BYTES, on_evict=None):
+        """
+        Args:
+            budget_bytes (int): Total bytes of model weights allowed in memory
+            on_evict: Optional callable run with the key of every model dropped, by eviction or
+                removal (e.g. to release per-model state and empty the CUDA cache)
+        """
+        self.budget_bytes = budget_bytes
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # least recently used first
+        self._footprints = {}  # last measured footprint per (key, precision), used to plan reloads
+        self._pending = {}  # bytes held for loads in progress, per key, until add() or cancel()
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._entries[key].bundle
+
+    def __delitem__(self, key):
+        if not self.remove(key):
+            raise KeyError(key)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def used_bytes(self):
+        """Bytes of the loaded models plus the bytes held for loads in progress."""
+        with self._lock:
+            return sum(entry.footprint for entry in self._entries.values()) + sum(self._pending.values())
+
+    def info(self, key):
+        """Details recorded with a loaded model (precision, device, ...), or None if it is not loaded."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry.info) if entry else None
+
+    def expected_footprint(self, key, precision=None):
+        """Footprint measured the last time this model was loaded at this precision, or None."""
+        with self._lock:
+            return self._footprints.get((key, precision))
+
+    @contextmanager
+    def use(self, key):
+        """
+        Mark a model busy for the duration of a request and record the hit.
+
+        Yields:
+            dict: The model bundle
+
+        Raises:
+            KeyError: If the model is not loaded
+        """
+        with self._lock:
+            entry = self._entries[key]
+            entry.active += 1
+            entry.hits += 1
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+        try:
+            yield entry.bundle
+        finally:
+            with self._lock:
+                entry.active -= 1
+                entry.last_used = time.time()
+
+    def reserve(self, nbytes, exclude=None, hold=None):
+        """
+        Evict least-recently-used idle models until nbytes more fit in the budget.
+
+        Nothing is evicted when the busy models alone leave no room for nbytes.
+
+        Args:
+            nbytes (int): Bytes to make room for
+            exclude (str): Key of a model that must not be evicted
+            hold (str): Key of a load in progress; when the bytes fit they stay reserved for it
+                until add() registers the model or cancel() gives them back
+
+        Returns:
+            bool: Whether the budget now has room for nbytes
+        """
+        evicted = []
+        with self._lock:
+            if hold is not None:
+                self._pending.pop(hold, None)
+            # Bytes held for other loads in progress cannot be evicted either
+            busy = sum(entry.footprint for key, entry in self._entries.items() if entry.active or key == exclude)
+            busy += sum(self._pending.values())
+            if busy + nbytes > self.budget_bytes:
+                # Evicting would not help, so keep the idle models
+                return False
+            for key in list(self._entries):
+                if self.used_bytes + nbytes <= self.budget_bytes:
+                    break
+                if self._entries[key].active or key == exclude:
+                    continue
+                evicted.append(key)
+                footprint = self._entries.pop(key).footprint
+                logger.info(f"Evicting idle model {key} ({footprint / 1024 ** 2:.0f} MB) to stay under budget")
+            fits = self.used_bytes + nbytes <= self.budget_bytes
+            if fits and hold is not None:
+                self._pending[hold] = nbytes
+        if evicted:
+            self._release(evicted)
+        return fits
+
+    def add(self, key, bundle, footprint, info=None):
+        """
+        Register a loaded model, evicting idle models to make room.
+
+        Args:
+            key (str): Cache key
+            bundle (dict): Model, tokenizer and pipeline
+            footprint (int): Measured bytes of the model
+            info (dict): Extra details reported with the model (precision, device, ...)
+
+        Raises:
+            ModelBudgetError: If the model does not fit even after evicting all idle models
+        """
+        with self._lock:
+            self._footprints[(key, (info or {}).get("precision"))] = footprint
+            # The measured footprint replaces the estimate held while loading
+            self._pending.pop(key, None)
+            # A model registered again under its key replaces the old entry, which is released below
+            replaced = self._entries.pop(key, None)
+            if not self.reserve(footprint):
+                if replaced is not None:
+                    self._entries[key] = replaced
+                raise ModelBudgetError(
+                    f"Model needs {footprint / 1024 ** 2:.0f} MB but only "
+                    f"{(self.budget_bytes - self.used_bytes) / 1024 ** 2:.0f} MB of the "
+                    f"{self.budget_bytes / 1024 ** 2:.0f} MB budget can be freed; unload a model in use first"
+                )
+            self._entries[key] = ModelEntry(key, bundle, footprint, info)
+            self._entries.move_to_end(key)
+        if replaced is not None:
+            self._release([key])
+
+    def cancel(self, key):
+        """Give back the bytes held for a load in progress that did not register a model."""
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def remove(self, key):
+        """Drop a model; requests already using it finish with their own reference. Returns whether it was loaded."""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+        self._release([key])
+        return True
+
+    def describe(self):
+        """Return {key: accounting dict} for every loaded model."""
+        with self._lock:
+            return {key: entry.to_dict() for key, entry in self._entries.items()}
+
+    def _release(self, keys):
+        gc.collect()
+        if self.on_evict:
+            for key in keys:
+                self.on_evict(key)
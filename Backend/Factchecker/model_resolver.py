@@ -0,0 +1,206 @@
+"""
+Offline-first resolution of HuggingFace model names.
+Looks for complete weights in a configured model directory and the local HF cache before
+asking the Hub, so cached models load without any network access.
+"""
+import os
+import json
+import glob
+import fnmatch
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.environ.get('HF_MODEL_DIR')
+HUB_TIMEOUT = float(os.environ.get('HF_HUB_TIMEOUT', 5))
+OFFLINE = os.environ.get('HF_HUB_OFFLINE', '0') == '1' or os.environ.get('TRANSFORMERS_OFFLINE', '0') == '1'
+
+WEIGHT_PATTERNS = ('*.safetensors', 'pytorch_model*.bin')
+WEIGHT_INDEXES = ('model.safetensors.index.json', 'pytorch_model.bin.index.json')
+DTYPE_BYTES = {'float32': 4, 'float16': 2, 'bfloat16': 2, 'float64': 8}
+TOKENIZER_FILES = ('tokenizer.json', 'tokenizer_config.json', 'vocab.json', 'tokenizer.model', 'vocab.txt')
+
+
+def hub_cache_dir():
+    """Directory of the huggingface_hub cache, honoring the usual environment overrides."""
+    if os.environ.get('HUGGINGFACE_HUB_CACHE'):
+        return os.environ['HUGGINGFACE_HUB_CACHE']
+    hf_home = os.environ.get('HF_HOME', os.path.join(os.path.expanduser('~'), '.cache', 'huggingface'))
+    return os.path.join(hf_home, 'hub')
+
+
+class ModelResolution:
+    """Where to load a model from."""
+
+    def __init__(self, model_name, source, path, weight_bytes=0, files=None):
+        """
+        Args:
+            model_name (str): The requested model name
+            source (str): 'local' (a validated directory) or 'hub'
+            path (str): Directory to pass to from_pretrained, or the Hub model name
+            weight_bytes (int): Size of the weight files on disk or on the Hub, when known
+            files (dict): {file name: size} of the Hub repository, when known
+        """
+        self.model_name = model_name
+        self.source = source
+        self.path = path
+        self.weight_bytes = weight_bytes
+        self.files = files
+
+    @property
+    def is_local(self):
+        return self.source == 'local'
+
+
+def validate_model_dir(path):
+    """
+    Check that a directory holds a loadable model: a parseable config, a tokenizer and every weight shard.
+
+    Returns:
+        int: Total bytes of the weight files, or None if the directory is incomplete
+    """
+    try:
+        with open(os.path.join(path, 'config.json'), encoding='utf-8') as f:
+            json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not any(os.path.isfile(os.path.join(path, name)) for name in TOKENIZER_FILES):
+        return None
+
+    # Sharded checkpoints list their shards in an index; every shard must be present
+    for index_name in WEIGHT_INDEXES:
+        index_path = os.path.join(path, index_name)
+        if os.path.isfile(index_path):
+            try:
+                with open(index_path, encoding='utf-8') as f:
+                    shards = set(json.load(f).get('weight_map', {}).values())
+            except (OSError, ValueError):
+                return None
+            shard_paths = [os.path.join(path, shard) for shard in shards]
+            if not shard_paths or not all(os.path.isfile(shard) for shard in shard_paths):
+                return None
+            return sum(os.path.getsize(shard) for shard in shard_paths)
+
+    # from_pretrained loads the safetensors files when there are any, else the .bin files;
+    # isfile follows the cache's blob symlinks, so interrupted downloads do not count
+    for pattern in WEIGHT_PATTERNS:
+        weights = [weight for weight in glob.glob(os.path.join(path, pattern)) if os.path.isfile(weight)]
+        if weights:
+            return sum(os.path.getsize(weight) for weight in weights)
+    return None
+
+
+def stored_dtype_bytes(path):
+    """Bytes per parameter of the weights in a model directory, from its config, or None if unreadable."""
+    try:
+        with open(os.path.join(path, 'config.json'), encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Checkpoints without a dtype in their config are stored in fp32
+    dtype = str(config.get('torch_dtype') or config.get('dtype') or 'float32').replace('torch.', '')
+    return DTYPE_BYTES.get(dtype)
+
+
+def model_revision(path):
+    """Identify the files of a local model: the commit of a Hub cache snapshot, else the config's modification time."""
+    path = os.path.normpath(path)
+    if os.path.basename(os.path.dirname(path)) == 'snapshots':
+        return os.path.basename(path)
+    try:
+        return str(int(os.path.getmtime(os.path.join(path, 'config.json'))))
+    except OSError:
+        return None
+
+
+def local_candidates(model_name):
+    """Directories that may hold the model, in lookup order."""
+    candidates = []
+    if os.path.isdir(model_name):
+        candidates.append(model_name)
+    if MODEL_DIR:
+        candidates.append(os.path.join(MODEL_DIR, model_name))
+        candidates.append(os.path.join(MODEL_DIR, model_name.replace('/', '--')))
+
+    # huggingface_hub layout: models--org--name/snapshots/<revision>, with refs/main naming the default revision
+    repo_dir = os.path.join(hub_cache_dir(), 'models--' + model_name.replace('/', '--'))
+    try:
+        with open(os.path.join(repo_dir, 'refs', 'main'), encoding='utf-8') as f:
+            candidates.append(os.path.join(repo_dir, 'snapshots', f.read().strip()))
+    except OSError:
+        pass
+    snapshots = glob.glob(os.path.join(repo_dir, 'snapshots', '*'))
+    candidates.extend(sorted(snapshots, key=os.path.getmtime, reverse=True))
+    return candidates
+
+
+def hub_files(model_name, timeout=HUB_TIMEOUT):
+    """
+    List the files of a Hub model with their sizes, giving up after timeout seconds.
+
+    Returns:
+        dict: {file name: size in bytes}, or None if the model is not on the Hub
+    """
+    try:
+        response = requests.get(f"https://huggingface.co/api/models/{model_name}", params={"blobs": "true"},
+                                timeout=timeout)
+        if response.status_code != 200:
+            return None
+        return {sibling["rfilename"]: sibling.get("size") or 0 for sibling in response.json().get("siblings", [])}
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logger.error(f"Error listing model {model_name} on the Hub: {str(e)}")
+        return None
+
+
+def hub_weight_files(files):
+    """Weight files from_pretrained would download: the safetensors files if any, else the .bin files."""
+    for pattern in WEIGHT_PATTERNS:
+        # Weights in subfolders belong to other components, not the model itself
+        names = [name for name in files if '/' not in name and fnmatch.fnmatch(name, pattern)]
+        if names:
+            return names
+    return []
+
+
+def hub_weight_bytes(files):
+    """Size of the weight files from_pretrained would download."""
+    return sum(files[name] for name in hub_weight_files(files))
+
+
+def is_on_hub(model_name, timeout=HUB_TIMEOUT):
+    """Check if a model exists on HuggingFace Hub, giving up after timeout seconds."""
+    try:
+        response = requests.get(f"https://huggingface.co/api/models/{model_name}", timeout=timeout)
+        return response.status_code == 200
+    except requests.RequestException as e:
+        logger.error(f"Error checking model {model_name} on the Hub: {str(e)}")
+        return False
+
+
+def resolve_model(model_name):
+    """
+    Find where to load a model from, contacting the Hub only when nothing usable is on disk.
+
+    Args:
+        model_name (str): Hub model name or local directory
+
+    Returns:
+        ModelResolution: The resolution, or None if the model is neither on disk nor on the Hub
+    """
+    for path in local_candidates(model_name):
+        weight_bytes = validate_model_dir(path)
+        if weight_bytes is not None:
+            logger.info(f"Resolved {model_name} to local files in {path}")
+            return ModelResolution(model_name, 'local', path, weight_bytes)
+
+    if OFFLINE:
+        logger.error(f"Model {model_name} is not available locally and the Hub is disabled (offline mode)")
+        return None
+    files = hub_files(model_name)
+    if files is not None:
+        # Sized from the Hub listing so the memory budget can be reserved before downloading
+        return ModelResolution(model_name, 'hub', model_name, hub_weight_bytes(files), files)
+    return None
@@ -0,0 +1,194 @@
+"""
+Persistent cache for scraped pages.
+Stores the extracted text and title of each article on disk, keyed by normalized URL,
+with size-bounded LRU eviction, a freshness TTL and ETag/Last-Modified revalidation.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', '1') != '0'
+CACHE_PATH = os.environ.get('PAGE_CACHE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'coragen', 'pages.sqlite3'))
+MAX_BYTES = int(float(os.environ.get('PAGE_CACHE_MAX_MB', 256)) * 1024 * 1024)
+TTL_SECONDS = float(os.environ.get('PAGE_CACHE_TTL', 24 * 3600))
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so trivially different spellings share one cache entry.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    parameters, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class PageCache:
+    """
+    SQLite-backed LRU cache of extracted page text.
+
+    Disk and database errors never reach the caller: lookups fail as misses and writes are
+    skipped, and a cache file that cannot be opened turns the cache off.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disabled = False
+
+    def _connection(self):
+        """The open database, or None once it could not be opened."""
+        if self._conn is None and not self._disabled:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS pages ('
+                    'key TEXT PRIMARY KEY, url TEXT, text TEXT, title TEXT, etag TEXT, last_modified TEXT, '
+                    'fetched_at REAL, last_access REAL, size INTEGER)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)')
+                self._conn = conn
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Page cache disabled, cannot open {self.path}: {str(e)}")
+                self._disabled = True
+        return self._conn
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """
+        Look up a cached page.
+
+        Returns:
+            dict: Entry with text, title, etag, last_modified and a 'fresh' flag, or None
+        """
+        key = self._key(url)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT text, title, etag, last_modified, fetched_at FROM pages WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute('UPDATE pages SET last_access = ? WHERE key = ?', (now, key))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache read failed: {str(e)}")
+                return None
+
+        text, title, etag, last_modified, fetched_at = row
+        return {
+            "text": text,
+            "title": title,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": now - fetched_at < self.ttl
+        }
+
+    def put(self, url, text, title, etag=None, last_modified=None):
+        """Store extracted text for a URL and evict least-recently-used pages over the size budget."""
+        key = self._key(url)
+        now = time.time()
+        size = len(text.encode('utf-8')) + len((title or '').encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, url, text, title, etag, last_modified, now, now, size)
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache write failed: {str(e)}")
+                # Do not leave a half-written insert for the next commit
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+
+    def touch(self, url):
+        """Mark a cached page as freshly validated (after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute('UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?',
+                             (now, now, self._key(url)))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache write failed: {str(e)}")
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        while total > self.max_bytes:
+            key, size = conn.execute('SELECT key, size FROM pages ORDER BY last_access LIMIT 1').fetchone()
+            conn.execute('DELETE FROM pages WHERE key = ?', (key,))
+            total -= size
+
+    def clear(self):
+        """Remove every cached page."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute('DELETE FROM pages')
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache clear failed: {str(e)}")
+
+
+def conditional_headers(entry):
+    """Build If-None-Match / If-Modified-Since headers for revalidating a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+    return headers
+
+
+def is_storable(response):
+    """Whether a response may be written to the cache."""
+    cache_control = response.headers.get('Cache-Control', '').lower()
+    return response.status_code == 200 and 'no-store' not in cache_control
+
+
+page_cache = PageCache() if CACHE_ENABLED else None
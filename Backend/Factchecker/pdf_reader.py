@@ -1,32 +1,98 @@
+import os
+import time
+import logging
+import tempfile
 import requests
 import PyPDF2
-from io import BytesIO
+import fetcher
+
+logger = logging.getLogger(__name__)
+
+# Extraction budget: most of a long report is never used downstream
+MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+MAX_CHARS = int(os.environ.get('PDF_MAX_CHARS', 100000))
+EXTRACT_DEADLINE = float(os.environ.get('PDF_EXTRACT_DEADLINE', 15))
+# Downloads larger than this are spooled to a temporary file instead of memory
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def extract_text_from_pdf(pdf_file, max_pages=MAX_PAGES, max_chars=MAX_CHARS, deadline=None):
+    """
+    Extract the text and title of a PDF, stopping at a page, character or time budget.
+
+    Pages are parsed lazily, so pages past the budget are never read.
+
+    Args:
+        pdf_file: A seekable binary file-like object holding the PDF
+        max_pages (int): Maximum number of pages to extract (None for all)
+        max_chars (int): Maximum characters of text to return (None for all)
+        deadline (float): time.monotonic() value after which the text extracted so far is returned
+
+    Returns:
+        tuple: (full text, title)
+    """
+    pdf_reader = PyPDF2.PdfReader(pdf_file)
+
+    # Collect page texts and join once instead of concatenating repeatedly
+    page_texts = []
+    length = 0
+    for index, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and index >= max_pages:
+            break
+        if max_chars is not None and length >= max_chars:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning(f"PDF extraction deadline reached after {index} pages, returning partial text")
+            break
+        # Extract text from the page and add it to the full text
+        page_text = page.extract_text()
+        if page_text:  # Ensure that the page contains text
+            page_texts.append(page_text + "\n")  # Add a newline after each page's text
+            length += len(page_text) + 1
+
+    full_text = "".join(page_texts)
+    if max_chars is not None:
+        full_text = full_text[:max_chars]
+
+    metadata = pdf_reader.metadata
+    title = metadata.title if metadata and metadata.title else "No title found"
+    return full_text, title
+
+
+def get_text_from_pdf_stream(chunks, timeout=EXTRACT_DEADLINE, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """
+    Extract (text, title) from a PDF whose bytes arrive as an iterable of chunks.
+
+    The download is spooled to a temporary file (in memory while small) and the
+    remaining time after the download is the extraction deadline.
+
+    Args:
+        chunks: Iterable of byte chunks
+        timeout (float): Seconds allowed for download plus extraction
+
+    Raises:
+        TimeoutError: If the download alone exceeds the timeout
+    """
+    deadline = time.monotonic() + timeout
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+        for chunk in chunks:
+            spool.write(chunk)
+            if time.monotonic() >= deadline:
+                # A truncated PDF cannot be parsed, so there is no partial result to return
+                raise TimeoutError(f"PDF download exceeded {timeout}s")
+        spool.seek(0)
+        return extract_text_from_pdf(spool, max_pages, max_chars, deadline)
 
 
 def get_text_from_pdf_url(pdf_url):
     try:
-        # Initialize a variable to hold all extracted text
-        full_text = ""
-
-        # Send a request to the PDF URL with a User-Agent header
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(pdf_url, headers=headers, timeout=60)
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            # Create a PDF reader object from bytes
-            pdf_reader = PyPDF2.PdfReader(BytesIO(response.content))
-
-            # Loop through each page in the PDF
-            for page in pdf_reader.pages:
-                # Extract text from the page and add it to the full text
-                page_text = page.extract_text()
-                if page_text:  # Ensure that the page contains text
-                    full_text += page_text + "\n"  # Add a newline after each page's text
-        else:
-            raise Exception(f"Failed to retrieve the PDF file. Status code: {response.status_code}")
+        # Stream the PDF through the pooled fetcher session (sets the User-Agent header)
+        with fetcher.stream(pdf_url, timeout=60) as response:
+            # Check if the request was successful
+            if response.status_code == 200:
+                full_text, _ = get_text_from_pdf_stream(response.iter_content(chunk_size=fetcher.CHUNK_SIZE))
+            else:
+                raise Exception(f"Failed to retrieve the PDF file. Status code: {response.status_code}")
 
         return full_text
     except Exception as e:
@@ -35,7 +101,7 @@ def get_text_from_pdf_url(pdf_url):
 
 def is_pdf_link(url):
     try:
-        response = requests.head(url, allow_redirects=True, timeout=5)
+        response = fetcher.fetch(url, timeout=5, method='HEAD', allow_redirects=True)
         content_type = response.headers.get('Content-Type', '').lower()
         return 'application/pdf' in content_type
     except requests.RequestException as e:
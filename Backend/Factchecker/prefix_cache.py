@@ -0,0 +1,117 @@
+"""
+Prompt-prefix KV cache for local generation.
+Keeps the past key/values computed for shared prompt preambles of each model, so a request
+starting with a cached preamble only prefills its own tail. Entries are evicted least
+recently used first when the cache exceeds its memory budget.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+PREFIX_CACHE_BYTES = int(float(os.environ.get('HF_PREFIX_CACHE_MB', 512)) * 1024 ** 2)
+# Shorter preambles are cheaper to prefill than to copy out of the cache
+MIN_PREFIX_TOKENS = int(os.environ.get('HF_PREFIX_MIN_TOKENS', 16))
+
+
+def cache_nbytes(past):
+    """Bytes held by a past_key_values object (a transformers Cache or nested tuples of tensors)."""
+    if hasattr(past, 'layers'):
+        # transformers >= 4.56 keeps per-layer key/value tensors on cache layer objects
+        return sum(cache_nbytes(getattr(layer, name, None)) for layer in past.layers for name in ('keys', 'values'))
+    if hasattr(past, 'to_legacy_cache'):
+        past = past.to_legacy_cache()
+    if hasattr(past, 'numel'):
+        return past.numel() * past.element_size()
+    if isinstance(past, (tuple, list)):
+        return sum(cache_nbytes(item) for item in past)
+    return 0
+
+
+class PrefixCache:
+    """LRU map of (model key, prefix token ids) to past key/values under a byte budget."""
+
+    def __init__(self, budget_bytes=PREFIX_CACHE_BYTES, min_tokens=MIN_PREFIX_TOKENS):
+        """
+        Args:
+            budget_bytes (int): Total bytes of cached key/values; 0 disables the cache
+            min_tokens (int): Prefixes shorter than this are not cached
+        """
+        self.budget_bytes = budget_bytes
+        self.min_tokens = min_tokens
+        self._entries = OrderedDict()  # (model key, ids) -> (past, nbytes), least recently used first
+        self._used = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "reused_tokens": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.budget_bytes > 0
+
+    def longest(self, model_key, ids):
+        """
+        Find the longest cached prefix of a token sequence.
+
+        The returned key/values are shared; copy them before handing them to generate(),
+        which extends the cache in place.
+
+        Returns:
+            tuple: (prefix length, past_key_values), or (0, None) when nothing matches
+        """
+        ids = tuple(ids)
+        with self._lock:
+            best = None
+            for key in self._entries:
+                cached_model, prefix = key
+                if cached_model == model_key and len(prefix) <= len(ids) and ids[:len(prefix)] == prefix:
+                    if best is None or len(prefix) > len(best[1]):
+                        best = key
+            if best is None:
+                self._stats["misses"] += 1
+                return 0, None
+            self._entries.move_to_end(best)
+            self._stats["hits"] += 1
+            self._stats["reused_tokens"] += len(best[1])
+            return len(best[1]), self._entries[best][0]
+
+    def put(self, model_key, ids, past):
+        """Cache the key/values of a prefix, evicting least recently used prefixes beyond the budget."""
+        ids = tuple(ids)
+        if len(ids) < self.min_tokens:
+            return
+        nbytes = cache_nbytes(past)
+        if nbytes > self.budget_bytes:
+            logger.info(f"Prefix of {len(ids)} tokens ({nbytes / 1024 ** 2:.0f} MB) exceeds the prefix cache budget")
+            return
+        with self._lock:
+            key = (model_key, ids)
+            if key in self._entries:
+                self._used -= self._entries.pop(key)[1]
+            self._entries[key] = (past, nbytes)
+            self._used += nbytes
+            while self._used > self.budget_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._used -= evicted_bytes
+                self._stats["evictions"] += 1
+
+    def drop(self, model_key):
+        """Forget every prefix of a model (when it is unloaded)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_key]:
+                self._used -= self._entries.pop(key)[1]
+
+    def stats(self, model_key=None):
+        """Hit counters plus the entries and bytes held, for one model or overall."""
+        with self._lock:
+            entries = [(key, nbytes) for key, (_, nbytes) in self._entries.items()
+                       if model_key is None or key[0] == model_key]
+            stats = {
+                "entries": len(entries),
+                "bytes": sum(nbytes for _, nbytes in entries),
+                "budget_bytes": self.budget_bytes
+            }
+            if model_key is None:
+                stats.update(self._stats)
+            return stats
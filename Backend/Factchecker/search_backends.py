@@ -0,0 +1,225 @@
+"""
+Pluggable web search backends.
+Each backend owns a pooled session, retries 429/5xx responses with jittered exponential
+backoff that honors Retry-After, and draws from its own token bucket to stay under quota.
+"""
+import os
+import time
+import random
+import logging
+import threading
+import urllib.error
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import fetcher
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 30.0
+
+BING_ENDPOINT = "https://api.bing.microsoft.com/v7.0/search"
+BING_MARKET = 'en-US'
+
+
+class RetryableSearchError(Exception):
+    """A transient search failure (throttling, 5xx, connection error) worth retrying."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate <= 0 disables limiting."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available, then take them."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SearchBackend:
+    """
+    Base class for search backends.
+
+    Subclasses implement _search_once; search() wraps it with rate limiting and retries.
+    Rate and retry settings default to SEARCH_<NAME>_QPS / _BURST / _RETRIES env vars.
+    """
+    name = None
+    default_qps = 0
+    default_burst = None
+
+    def __init__(self, qps=None, burst=None, max_retries=None, backoff_base=0.5, backoff_max=8.0):
+        prefix = f"SEARCH_{(self.name or 'default').upper()}_"
+        qps = float(os.environ.get(prefix + 'QPS', self.default_qps)) if qps is None else qps
+        burst = os.environ.get(prefix + 'BURST', self.default_burst) if burst is None else burst
+        self.bucket = TokenBucket(qps, float(burst) if burst else None)
+        self.max_retries = int(os.environ.get(prefix + 'RETRIES', 3)) if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = fetcher.create_session(pool_connections=4, pool_maxsize=16)
+
+    def _search_once(self, query, count):
+        raise NotImplementedError
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def search(self, query, count=10):
+        """
+        Search for a query.
+
+        Args:
+            query (str): The search query
+            count (int): Maximum number of results
+
+        Returns:
+            list: Result URLs, best first
+        """
+        return self._with_retries(self._search_once, query, count)
+
+    def _with_retries(self, fn, *args):
+        """Call fn under the rate limiter, retrying RetryableSearchError with backoff."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn(*args)
+            except RetryableSearchError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e.retry_after)
+                logger.warning(f"{self.name} search failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+
+class BingSearchBackend(SearchBackend):
+    """Bing Web Search API v7."""
+    name = 'bing'
+    default_qps = 3
+
+    def __init__(self, subscription_key=None, **kwargs):
+        super().__init__(**kwargs)
+        self.subscription_key = subscription_key
+
+    def _headers(self):
+        # Read the key lazily so importing this module never requires BING_KEY
+        return {'Ocp-Apim-Subscription-Key': self.subscription_key or os.environ['BING_KEY']}
+
+    def query_raw(self, query, count):
+        """Return the raw Bing JSON response for a query (rate limited and retried)."""
+        return self._with_retries(self._query_once, query, count)
+
+    def _query_once(self, query, count):
+        params = {'q': query, 'mkt': BING_MARKET, 'answerCount': 10, 'count': count, 'promote': 'webpages'}
+        try:
+            response = self.session.get(BING_ENDPOINT, headers=self._headers(), params=params, timeout=10)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableSearchError(str(e))
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableSearchError(f"HTTP {response.status_code}",
+                                       parse_retry_after(response.headers.get('Retry-After')))
+        response.raise_for_status()
+        return response.json()
+
+    def _search_once(self, query, count):
+        data = self._query_once(query, count)
+        pages = (data.get('webPages') or {}).get('value') or []
+        return [page['url'] for page in pages[:count] if page.get('url')]
+
+
+class GoogleSearchBackend(SearchBackend):
+    """Google results scraped through the googlesearch package."""
+    name = 'google'
+    default_qps = 0.5
+
+    def _search_once(self, query, count):
+        # googlesearch manages its own urllib connection, so only rate limiting and retries apply here
+        from googlesearch import search
+        try:
+            return list(search(query, verify_ssl=False, num=count, stop=count, pause=0))  # temporarily making it false
+        except urllib.error.HTTPError as e:
+            if e.code in RETRY_STATUSES:
+                raise RetryableSearchError(f"HTTP {e.code}", parse_retry_after(e.headers.get('Retry-After')))
+            raise
+        except urllib.error.URLError as e:
+            raise RetryableSearchError(str(e))
+
+
+class StubSearchBackend(SearchBackend):
+    """Offline backend returning canned or generated URLs, for tests and local development."""
+    name = 'stub'
+
+    def __init__(self, results=None, **kwargs):
+        super().__init__(**kwargs)
+        self.results = results or {}
+
+    def _search_once(self, query, count):
+        if query in self.results:
+            return list(self.results[query])[:count]
+        slug = '-'.join(query.lower().split())[:64]
+        return [f"https://example.com/{slug}/{i}" for i in range(count)]
+
+
+BACKENDS = {
+    'bing': BingSearchBackend,
+    'google': GoogleSearchBackend,
+    'stub': StubSearchBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name):
+    """Return the shared backend instance for a search system name."""
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown search backend: {name}")
+            backend = BACKENDS[name]()
+            _instances[name] = backend
+        return backend
+
+
+def register_backend(name, backend):
+    """Install a backend instance (e.g. a configured StubSearchBackend) under a name."""
+    with _instances_lock:
+        _instances[name] = backend
@@ -0,0 +1,109 @@
+"""
+In-process cache for web search results.
+LRU + TTL storage with single-flight coalescing, so identical concurrent lookups
+share one upstream search call.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 1024))
+TTL_SECONDS = float(os.environ.get('SEARCH_CACHE_TTL', 3600))
+
+
+def normalize_query(text):
+    """Casefold and collapse whitespace so trivially different queries share a cache key."""
+    return re.sub(r'\s+', ' ', str(text or '')).strip().casefold()
+
+
+class _Flight:
+    """An upstream call in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchCache:
+    """Thread-safe LRU + TTL cache with single-flight lookups."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def get_or_fetch(self, key, fetch_fn):
+        """
+        Return the cached value for key, calling fetch_fn at most once across concurrent callers.
+
+        Args:
+            key: Hashable cache key
+            fetch_fn: Zero-argument callable producing the value on a miss
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._stats["misses"] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch_fn()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, flight.result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round((self._stats["hits"] + self._stats["coalesced"]) / lookups, 3) if lookups else 0.0
+            }
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,146 @@
+"""
+Background search jobs.
+Runs long searches on a bounded worker pool, tracks per-stage progress and partial
+results, and cancels outstanding fetches and LLM calls on request.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from concurrency import cancellation_scope, SearchCancelled
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get('SEARCH_JOB_WORKERS', 4))
+JOB_TTL_SECONDS = float(os.environ.get('SEARCH_JOB_TTL', 3600))
+
+STAGES = ["search", "articles", "summaries", "groundedness"]
+
+
+class SearchJob:
+    """State of one background search."""
+
+    def __init__(self, request_data):
+        self.id = uuid.uuid4().hex
+        self.request_data = request_data
+        self.status = "queued"
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.progress = {attribute: {stage: False for stage in STAGES} for attribute in request_data.get('attributes', [])}
+        self.cross_attribute_done = False
+        self.partial_results = {}
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def record(self, event, payload):
+        """Pipeline on_event callback: mark a stage done and keep a snapshot of its output."""
+        if event == "summaryToken":
+            # Token-level progress only matters to live streams; jobs report the finished summaries
+            return
+        # Round-trip through JSON so later stages mutating the same dicts cannot alter the snapshot
+        snapshot = json.loads(json.dumps(payload))
+        with self._lock:
+            if event == "crossAttribute":
+                self.cross_attribute_done = True
+            else:
+                attribute = snapshot.pop("attribute", None)
+                self.progress.setdefault(attribute, {stage: False for stage in STAGES})[event] = True
+                self.partial_results.setdefault(attribute, {})[event] = snapshot
+            self.updated_at = time.time()
+
+    def set_status(self, status, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.updated_at = time.time()
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self):
+        """Serialize the job for the status endpoint."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+                "progress": {
+                    "attributes": self.progress,
+                    "crossAttribute": self.cross_attribute_done
+                },
+                "partial_results": self.partial_results if self.result is None else {},
+                "result": self.result,
+                "error": self.error
+            }
+
+
+class JobManager:
+    """Runs SearchJobs on a bounded thread pool and keeps them for JOB_TTL_SECONDS after they finish."""
+
+    def __init__(self, runner, max_workers=MAX_WORKERS, ttl=JOB_TTL_SECONDS):
+        """
+        Args:
+            runner: Callable(request_data, on_event) returning the final search response
+            max_workers: Number of searches run concurrently; further jobs queue
+            ttl: Seconds to keep finished jobs for polling
+        """
+        self.runner = runner
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, request_data):
+        """Queue a search and return its job."""
+        job = SearchJob(request_data)
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Request cancellation; returns the job, or None if unknown."""
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_event.set()
+            if job.status == "queued":
+                job.set_status("cancelled")
+        return job
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            return
+        job.set_status("running")
+        try:
+            with cancellation_scope(job.cancel_event):
+                result = self.runner(job.request_data, job.record)
+            if job.cancel_event.is_set():
+                job.set_status("cancelled")
+            else:
+                job.set_status("succeeded", result=result)
+        except SearchCancelled:
+            logger.info(f"Search job {job.id} cancelled")
+            job.set_status("cancelled")
+        except Exception as e:
+            logger.error(f"Search job {job.id} failed: {str(e)}", exc_info=True)
+            job.set_status("failed", error=str(e))
+
+    def _expire(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and now - job.updated_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
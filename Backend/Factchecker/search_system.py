@@ -1,18 +1,44 @@
-from googlesearch import search
-from bing_search import bing_search_get_multiple
+import logging
+from search_backends import get_backend
+from search_cache import SearchCache, normalize_query
 
-def search_query(query, attribute, search_settings: dict):
+logger = logging.getLogger(__name__)
+
+search_cache = SearchCache()
+
+
+def _search_uncached(query, attribute, search_settings: dict):
     if search_settings['search_system'] == 'google':
         print(f'Searching over Google...')
         # TODO: add rule to only return text (not video/images)
-        return search(f"Give articles related to the query: {query} with the attribute : {attribute}", verify_ssl=False, num=search_settings['num_results']*(0.1)) # temporarily making it false
+        return get_backend('google').search(f"Give articles related to the query: {query} with the attribute : {attribute}", count=search_settings['num_results'])
 
     elif search_settings['search_system'] == 'bing':#TODO: dynamically generate aspect based query
         generated_query_with_keywords = "";
-        return bing_search_get_multiple(f"{query} {attribute}", count=5)
+        return get_backend('bing').search(f"{query} {attribute}", count=5)
+
+    elif search_settings['search_system'] == 'stub':
+        return get_backend('stub').search(f"{query} {attribute}", count=search_settings['num_results'])
         #TODO: add other search systems
     else:
-        return search(query)
+        return get_backend('google').search(query, count=search_settings['num_results'])
+
+
+def search_query(query, attribute, search_settings: dict):
+    """Search for a query/attribute pair, serving repeats from the result cache."""
+    key = (
+        search_settings['search_system'],
+        normalize_query(query),
+        normalize_query(attribute),
+        search_settings['num_results']
+    )
+    try:
+        # Copy so callers can never mutate the shared cached list
+        return list(search_cache.get_or_fetch(key, lambda: list(_search_uncached(query, attribute, search_settings))))
+    except Exception as e:
+        # A search that still fails after retries only loses this attribute, not the whole request
+        logger.error(f"Search failed for '{query} {attribute}' on {search_settings['search_system']}: {str(e)}")
+        return []
 
 def display_snippet(html_content, settings=None):
     return html_content[:200]
@@ -0,0 +1,208 @@
+"""
+Map-reduce summarization with a reused seq2seq model.
+Content is split into tokenizer-bounded chunks on sentence boundaries, every chunk is
+summarized in batched generate calls (map), and the chunk summaries are summarized again
+(reduce) until one summary remains, which is returned as a few key points.
+The model is driven through generate() directly, which also works on transformers
+releases without the summarization pipeline.
+"""
+import os
+import re
+import logging
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+from llm_cache import llm_cache
+from model_manager import ModelBudgetError, model_footprint
+from model_loader import ModelLoader, LOAD_WAIT_TIMEOUT
+from model_resolver import ModelResolution, resolve_model
+from huggingface_handler import model_cache
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.environ.get('HF_SUMMARY_MODEL', 'facebook/bart-large-cnn')
+# Leaves room for special tokens within BART's 1024-token input
+CHUNK_TOKENS = int(os.environ.get('HF_SUMMARY_CHUNK_TOKENS', 900))
+BATCH_SIZE = int(os.environ.get('HF_SUMMARY_BATCH_SIZE', 8))
+MAX_REDUCE_ROUNDS = 3
+
+SUMMARY_PARAMS = {"max_length": 130, "min_length": 30, "do_sample": False}
+# Chunks shorter than this are already summary-sized and are passed through as they are
+MIN_SUMMARIZE_TOKENS = 2 * SUMMARY_PARAMS["min_length"]
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def chunk_by_tokens(text, tokenizer, max_tokens=CHUNK_TOKENS):
+    """
+    Pack whole sentences into chunks of at most max_tokens tokenizer tokens.
+
+    A sentence longer than max_tokens on its own is cut into token windows.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    # Sentences are counted as they appear inside a chunk, after a space
+    lengths = [len(ids) for ids in tokenizer([" " + sentence for sentence in sentences],
+                                             add_special_tokens=False)["input_ids"]]
+
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence, length in zip(sentences, lengths):
+        if length > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            ids = tokenizer(sentence, add_special_tokens=False)["input_ids"]
+            chunks.extend(tokenizer.decode(ids[start:start + max_tokens]).strip()
+                          for start in range(0, len(ids), max_tokens))
+            continue
+        if current and current_tokens + length > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += length
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _load_summarizer_model(model_name, model_type='summarizer', progress=None, token=None):
+    """
+    Load the summarization model into the model cache; runs on a summarizer_loader worker.
+
+    Returns:
+        dict: Status of the load, like huggingface_handler's loads
+    """
+    cache_key = f"summarizer_{model_name}"
+    progress = progress or (lambda stage: None)
+    if cache_key in model_cache:
+        return {"status": "success", "message": "Model already loaded", "model_id": model_name}
+
+    try:
+        progress("resolving")
+        resolution = resolve_model(model_name)
+        if resolution is None:
+            if not token:
+                return {"status": "error", "message": f"Model {model_name} not found locally or on HuggingFace"}
+            # Private models are only visible with the token, so their size is learned after loading
+            resolution = ModelResolution(model_name, 'hub', model_name)
+
+        # Make room before materializing and hold it until the model is registered
+        expected = model_cache.expected_footprint(cache_key) or resolution.weight_bytes
+        if expected and not model_cache.reserve(expected, hold=cache_key):
+            return {"status": "error", "message": f"Not enough memory budget to load {model_name}; unload a model first"}
+
+        logger.info(f"Loading summarization model {model_name} from {resolution.path}...")
+        progress("materializing")
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        tokenizer = AutoTokenizer.from_pretrained(resolution.path, local_files_only=resolution.is_local, token=token)
+        model = AutoModelForSeq2SeqLM.from_pretrained(resolution.path, local_files_only=resolution.is_local,
+                                                      token=token).to(device)
+        model.eval()
+        model_cache.add(cache_key, {
+            "model": model,
+            "tokenizer": tokenizer
+        }, model_footprint(model), {"device": device, "source": resolution.source})
+        return {"status": "success", "message": "Model loaded successfully", "model_id": model_name}
+
+    except ModelBudgetError as e:
+        logger.error(f"Summarization model {model_name} does not fit in the memory budget: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+    finally:
+        model_cache.cancel(cache_key)
+
+
+# Concurrent summaries share one load of the model; other models keep loading meanwhile
+summarizer_loader = ModelLoader(_load_summarizer_model)
+
+
+def _load_summarizer(model_name, token=None):
+    """Load the summarization model once and register it in the model cache, returning its cache key."""
+    cache_key = f"summarizer_{model_name}"
+    if cache_key not in model_cache:
+        task = summarizer_loader.submit(cache_key, model_name, "summarizer", token=token)
+        if not task.wait(LOAD_WAIT_TIMEOUT):
+            raise TimeoutError(f"Summarization model {model_name} still loading after {LOAD_WAIT_TIMEOUT}s")
+        if task.result["status"] != "success":
+            raise RuntimeError(task.result["message"])
+    return cache_key
+
+
+def _summarize_chunks(model, tokenizer, chunks):
+    """Map step: summarize every chunk, in batches, passing through chunks that are already short."""
+    lengths = [len(ids) for ids in tokenizer(chunks, add_special_tokens=False)["input_ids"]]
+    to_summarize = [i for i, length in enumerate(lengths) if length >= MIN_SUMMARIZE_TOKENS]
+
+    # Tokenizers without a configured limit report a huge model_max_length
+    max_length = min(tokenizer.model_max_length, getattr(model.config, "max_position_embeddings", None) or 1024)
+
+    summaries = list(chunks)
+    for start in range(0, len(to_summarize), BATCH_SIZE):
+        batch = to_summarize[start:start + BATCH_SIZE]
+        inputs = tokenizer([chunks[i] for i in batch], return_tensors="pt", padding=True, truncation=True,
+                           max_length=max_length).to(model.device)
+        with torch.inference_mode():
+            output = model.generate(**inputs, **SUMMARY_PARAMS)
+        for i, text in zip(batch, tokenizer.batch_decode(output, skip_special_tokens=True)):
+            summaries[i] = text.strip()
+    return summaries
+
+
+def _group_points(sentences, max_points):
+    """Split sentences into at most max_points contiguous, evenly sized points."""
+    if len(sentences) <= max_points:
+        return sentences
+    size, extra = divmod(len(sentences), max_points)
+    points, start = [], 0
+    for i in range(max_points):
+        end = start + size + (1 if i < extra else 0)
+        points.append(" ".join(sentences[start:end]))
+        start = end
+    return points
+
+
+def summarize(content, max_points=4, model_name=MODEL_NAME, token=None):
+    """
+    Summarize content of any length into at most max_points key points.
+
+    Args:
+        content (str): Text to summarize
+        max_points (int): Maximum number of points returned
+        model_name (str): HuggingFace summarization model
+        token (str): Optional HuggingFace token for downloading the model
+
+    Returns:
+        list: Summary points
+    """
+    if not content or not content.strip():
+        return []
+
+    def compute():
+        cache_key = _load_summarizer(model_name, token)
+        with model_cache.use(cache_key) as bundle:
+            model = bundle["model"]
+            tokenizer = bundle["tokenizer"]
+
+            summaries = _summarize_chunks(model, tokenizer, chunk_by_tokens(content, tokenizer))
+            # Reduce: re-chunk and summarize the joined summaries until they form a single summary
+            for _ in range(MAX_REDUCE_ROUNDS):
+                if len(summaries) <= 1:
+                    break
+                summaries = _summarize_chunks(model, tokenizer, chunk_by_tokens(" ".join(summaries), tokenizer))
+
+        return _group_points(split_sentences(" ".join(summaries)), max_points)
+
+    # Beam search without sampling is deterministic, so repeated content is served from the cache
+    return llm_cache.get_or_compute(
+        f"local:summarizer_{model_name}",
+        content,
+        {**SUMMARY_PARAMS, "max_points": max_points, "chunk_tokens": CHUNK_TOKENS},
+        compute
+    )
@@ -0,0 +1,115 @@
+"""
+CPU sentence embeddings for comparing summaries.
+Embeds texts once and scores every pair with a single matrix product.
+"""
+import os
+import re
+import time
+import logging
+import hashlib
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.environ.get('SUMMARY_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+HASHING_DIMENSIONS = 2 ** 14
+# How long a model that failed to load is skipped before loading is tried again
+ENCODER_RETRY_SECONDS = float(os.environ.get('SUMMARY_EMBEDDING_RETRY', 600))
+
+_encoders = {}
+_failed_encoders = {}  # model name -> (retry after, error message)
+_encoders_lock = threading.Lock()
+
+
+def _load_encoder(model_name):
+    """
+    Load (once) a transformers encoder and tokenizer for mean-pooled sentence embeddings.
+
+    A failed load is remembered for ENCODER_RETRY_SECONDS, so callers fall back to hashing
+    immediately instead of waiting on the same failure (e.g. network timeouts when offline).
+    """
+    with _encoders_lock:
+        if model_name not in _encoders:
+            failed = _failed_encoders.get(model_name)
+            if failed and failed[0] > time.monotonic():
+                raise RuntimeError(f"loading failed recently: {failed[1]}")
+
+            try:
+                import torch
+                from transformers import AutoTokenizer, AutoModel
+
+                logger.info(f"Loading embedding model {model_name}...")
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = AutoModel.from_pretrained(model_name, torch_dtype=torch.float32)
+                model.eval()
+            except Exception as e:
+                _failed_encoders[model_name] = (time.monotonic() + ENCODER_RETRY_SECONDS, str(e))
+                raise
+            _failed_encoders.pop(model_name, None)
+            _encoders[model_name] = (tokenizer, model)
+        return _encoders[model_name]
+
+
+def _embed_transformer(texts, model_name, batch_size=32):
+    import torch
+
+    tokenizer, model = _load_encoder(model_name)
+    vectors = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            batch = tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                              max_length=256, return_tensors='pt')
+            hidden = model(**batch).last_hidden_state
+            mask = batch['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors.append(pooled.numpy())
+    return np.vstack(vectors)
+
+
+def _embed_hashing(texts, dimensions=HASHING_DIMENSIONS):
+    """Dependency-free fallback: hashed, sublinear-tf bag of unigrams and bigrams."""
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = re.findall(r'\w+', text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            index = int.from_bytes(hashlib.md5(feature.encode('utf-8')).digest()[:4], 'little') % dimensions
+            matrix[row, index] += 1.0
+    return np.log1p(matrix)
+
+
+def embed_texts(texts, backend='transformer', model_name=EMBEDDING_MODEL):
+    """
+    Embed texts into L2-normalized vectors.
+
+    Args:
+        texts (list): Strings to embed
+        backend (str): 'transformer' for a local encoder model, or 'hashing'
+        model_name (str): Encoder model used by the transformer backend
+
+    Returns:
+        np.ndarray: Matrix of shape (len(texts), dimensions) with unit-length rows
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    embeddings = None
+    if backend == 'transformer':
+        try:
+            embeddings = _embed_transformer(texts, model_name)
+        except Exception as e:
+            logger.warning(f"Embedding model {model_name} unavailable, using hashing embeddings: {str(e)}")
+    if embeddings is None:
+        embeddings = _embed_hashing(texts)
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def similarity_scores(embeddings):
+    """Map the pairwise cosine similarity of normalized embeddings onto the 0-5 relevance scale."""
+    cosine = (embeddings @ embeddings.T).astype(np.float64)
+    return np.round(np.clip(cosine, 0.0, 1.0) * 5.0, 1)
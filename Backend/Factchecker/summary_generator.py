@@ -1,11 +1,14 @@
+import os
 import logging
 import json
 import requests
 import openai
 
-from transformers import pipeline
 import anthropic
 
+from llm_cache import cached_post_json
+from summarization_engine import summarize
+
 logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -69,11 +72,8 @@ Format your response as concise, insightful paragraphs (1-2 sentences each) in t
 
         ENDPOINT = "https://sweden-api.openai.azure.com/openai/deployments/gpt-4o-mini-atharv/chat/completions?api-version=2024-02-15-preview"
 
-        # Send request
-        response = requests.post(ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-
-        response_json = response.json()
+        # Send request (sampled generations are only served from cache when LLM_CACHE_ALLOW_SAMPLED=1)
+        response_json = cached_post_json(ENDPOINT, headers, payload)
         content = response_json['choices'][0]['message']['content']
         parsed_content = json.loads(content.strip('```json\n').strip('```'))
 
@@ -118,22 +118,8 @@ def generate_claude_summary(content: str, api_key: str) -> list:
 def generate_huggingface_summary(content: str, api_key: str) -> list:
     """Generate summary using HuggingFace models"""
     try:
-        summarizer = pipeline(
-            "summarization",
-            model="facebook/bart-large-cnn",
-            token=api_key
-        )
-
-        # Handle long content by chunking
-        max_chunk_length = 1024
-        chunks = [content[i:i + max_chunk_length] for i in range(0, len(content), max_chunk_length)]
-
-        summaries = []
-        for chunk in chunks:
-            result = summarizer(chunk, max_length=130, min_length=30)
-            summaries.append(result[0]['summary_text'])
-
-        return summaries
+        # The model is loaded once and reused; chunks are summarized in batches and merged
+        return summarize(content, max_points=4, token=api_key)
     except Exception as e:
         logger.error(f"HuggingFace summary error: {str(e)}")
         return []